@@ -1,629 +1,1294 @@
-import tkinter as tk
-from tkinter import messagebox, simpledialog
-import json
-import os
-import datetime
-
-DATA_FILE = "tasks.json"
-today = datetime.date.today()
-
-# 预填充历史数据
-def initialize_data():
-    data = {"tasks": [], "history": {}}
-    for i in range(1, 369):
-        past_date = today - datetime.timedelta(days=i)
-        data["history"][past_date.isoformat()] = {}
-    save_data(data)
-    return data
-
-
-# 加载任务数据
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return initialize_data()
-
-
-# 保存任务数据
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
-# 任务管理类
-class TaskManager:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("每日任务追踪")
-
-        self.data = load_data()
-        self.today = datetime.date.today().isoformat()
-
-        # 设置当前年
-        self.current_year = datetime.date.today().year
-
-        self.create_widgets()
-        self.load_tasks()
-        self.draw_contribution_map()
-        self.schedule_date_check()
-
-    # 调整窗口
-    def adjust_height(self):
-        self.root.update_idletasks()  # 强制刷新窗口尺寸计算
-        new_height = self.root.winfo_reqheight()  # 获取内容所需的高度
-        self.root.geometry(f"400x{new_height}")  # 仅修改高度，宽度不变
-
-    def create_widgets(self):
-        # 📌 任务管理区域（加边框）
-        self.task_frame = tk.LabelFrame(
-            self.root, text="任务管理", font=("微软雅黑", 12, "bold"), padx=10, pady=10
-        )
-        self.task_frame.pack(fill="x", padx=10, pady=10)
-
-        self.task_vars = {}
-        self.task_checkbuttons = {}
-
-        # 📌 在任务管理区域上方添加 "今日日期"
-        self.date_label = tk.Label(
-            self.task_frame,
-            text=f"📅 今日日期: {self.today}",
-            font=("微软雅黑", 12, "bold"),
-            fg="black",
-        )
-        self.date_label.pack(anchor="w", pady=(0, 5))  # 🔹 让日期靠左，增加底部间距
-
-        # ✅ 按钮行
-        button_frame = tk.Frame(self.task_frame)
-        button_frame.pack(fill="x", pady=5)
-
-        self.add_task_button = tk.Button(
-            button_frame,
-            text="➕ 添加任务",
-            font=("微软雅黑", 12, "bold"),
-            padx=10,
-            pady=5,
-            command=self.add_task,
-        )
-        self.add_task_button.pack(side="left", padx=5, pady=5)
-
-        self.save_button = tk.Button(
-            button_frame,
-            text="💾 保存进度",
-            font=("微软雅黑", 12, "bold"),
-            padx=10,
-            pady=5,
-            command=self.save_progress,
-        )
-        self.save_button.pack(side="left", padx=5, pady=5)
-
-        # 📌 任务列表区域
-        self.frame = tk.Frame(self.task_frame)
-        self.frame.pack(fill="x")
-
-        # ✅ 任务选择 & 删除按钮行
-        task_delete_frame = tk.Frame(self.task_frame)
-        task_delete_frame.pack(fill="x", pady=5)
-
-        # 📌 任务删除按钮
-        self.delete_task_button = tk.Button(
-            task_delete_frame,
-            text="🗑 删除任务",
-            font=("微软雅黑", 12, "bold"),
-            padx=10,
-            pady=5,
-            command=self.delete_task,
-        )
-        self.delete_task_button.pack(side="left", padx=5, pady=5)  # 🔹 让按钮靠左，间距相同
-
-        # 📌 任务选择 OptionMenu
-        self.task_list = self.data["tasks"] if self.data["tasks"] else ["暂无任务"]  # ✅ 确保不为空
-        self.task_var = tk.StringVar(value=self.task_list[0])  # ✅ 设置默认选项
-
-        self.task_menu = tk.OptionMenu(task_delete_frame, self.task_var, *self.task_list)
-        self.task_menu.config(font=("微软雅黑", 12, "bold"), padx=10, pady=5, width=8)
-        self.task_menu.pack(side="left", padx=5, pady=5)  # 🔹 让 OptionMenu 靠左
-
-
-        # 📌 热力图区域（用 LabelFrame 包裹，保证布局稳定，并添加标题和边框）
-        self.canvas_container = tk.LabelFrame(
-            self.root, text="热力图", font=("微软雅黑", 12, "bold"), bd=2, relief="ridge"
-        )  # ✅ 使用 LabelFrame
-        self.canvas_container.pack(fill="both", expand=True, padx=10, pady=10)
-
-        # 📌 年份选择框 + 任务进度悬停提示（放在同一行）
-        self.year_hover_frame = tk.Frame(
-            self.canvas_container
-        )  # 🔹 创建一个新 Frame 作为容器
-        self.year_hover_frame.pack(
-            side="top", anchor="w", fill="x", padx=10, pady=5
-        )  # 🔹 让它位于热力图顶部
-
-        # 📌 年份选择框（左侧）
-        self.year_var = tk.StringVar(value=str(datetime.date.today().year))
-        self.year_menu = tk.OptionMenu(
-            self.year_hover_frame,
-            self.year_var,
-            *self.get_available_years(),
-            command=self.change_year,
-        )
-        self.year_menu.config(font=("微软雅黑", 12, "bold"), padx=10, pady=5)
-        self.year_menu.pack(side="left", padx=5)  # 🔹 让年份选择框靠左
-
-        # 📌 空白填充 Frame → 让 hover 提示居中
-        self.spacer = tk.Label(self.year_hover_frame)
-        self.spacer.pack(
-            side="left", expand=True
-        )  # 🔹 自动填充空白区域，使 hover 提示居中
-
-        # 📌 任务进度悬停提示（居中）
-        self.hover_text = tk.StringVar()
-        self.hover_label = tk.Label(
-            self.year_hover_frame,
-            textvariable=self.hover_text,
-            font=("微软雅黑", 12, "bold"),
-            fg="black",
-        )
-        self.hover_label.pack(side="left")  # 🔹 放在中间区域
-
-        # 📌 右侧填充 Frame → 确保 hover_text 保持居中
-        self.spacer_right = tk.Label(self.year_hover_frame)
-        self.spacer_right.pack(
-            side="right", expand=True
-        )  # 🔹 自动填充空白区域，使 hover 提示居中
-
-        # 📌 Canvas 热力图区域（现在在年份选择框下方）
-        self.canvas_frame = tk.Frame(self.canvas_container)
-        self.canvas_frame.pack(
-            side="top", fill="both", expand=True, padx=15, pady=15
-        )  # 🔹 让它位于年份选择框下方
-
-        self.canvas = tk.Canvas(
-            self.canvas_frame,
-            width=800,
-            height=160,
-            bg="white",
-            scrollregion=(0, 0, 2000, 150),
-        )
-        self.scroll_x = tk.Scrollbar(
-            self.canvas_frame, orient="horizontal", command=self.canvas.xview
-        )
-        self.canvas.configure(xscrollcommand=self.scroll_x.set)
-
-        self.canvas.pack(side="top", fill="both", expand=True)
-        self.scroll_x.pack(side="bottom", fill="x")
-
-        self.canvas.bind("<Motion>", self.on_hover)
-        
-    def load_tasks(self):
-        """加载任务并更新任务列表"""
-        for widget in self.frame.winfo_children():
-            widget.destroy()  # 先清空之前的任务
-        self.task_vars.clear()
-        self.task_checkbuttons.clear()
-
-        self.frame.columnconfigure(0, weight=1)  # 让任务居中
-
-        for row, task in enumerate(self.data["tasks"]):
-            var = tk.IntVar(value=self.data["history"].get(self.today, {}).get(task, 0))
-
-            # 统一字体 & 让文本居中
-            chk = tk.Checkbutton(
-                self.frame,
-                text=task,
-                variable=var,
-                font=("微软雅黑", 12, "bold"),
-                anchor="center",
-                padx=10,
-            )
-            chk.grid(row=row, column=0, sticky="nsew", padx=5, pady=0)  # 让它填充整列
-
-            # 绑定点击事件（此时 chk 已经创建）
-            chk.config(command=lambda chk=chk, var=var: self.toggle_color(chk, var))
-
-            self.task_vars[task] = var
-            self.task_checkbuttons[task] = chk
-
-            # **初始化颜色**
-            self.toggle_color(chk, var)
-
-        # ✅ 更新任务下拉菜单
-        self.update_task_menu()
-
-    def toggle_color(self, chk, var):
-        """切换任务状态时更改颜色"""
-        if var.get():
-            chk.config(fg="green")  # 任务完成 → 绿色
-        else:
-            chk.config(fg="red")  # 任务未完成 → 红色
-
-
-
-    def update_task_menu(self):
-        """更新任务选择的下拉菜单"""
-        menu = self.task_menu["menu"]
-        menu.delete(0, "end")  # 清空菜单
-
-        for task in self.data["tasks"]:
-            menu.add_command(label=task, command=lambda value=task: self.task_var.set(value))
-
-        # 如果任务列表不为空，则选择第一个任务
-        if self.data["tasks"]:
-            self.task_var.set(self.data["tasks"][0])
-        else:
-            self.task_var.set("选择任务")
-
-
-    def add_task(self):
-        task = simpledialog.askstring("添加任务", "输入新任务:")
-        if task and task not in self.data["tasks"]:
-            self.data["tasks"].append(task)
-            self.load_tasks()
-            save_data(self.data)
-            self.adjust_height()  # 调整窗口高度
-
-    def save_progress(self):
-        self.data["history"].setdefault(self.today, {})
-
-        completed_tasks = sum(var.get() for var in self.task_vars.values())  # 计算完成的任务数
-        total_tasks = len(self.task_vars)  # 计算当天的任务总数
-
-        self.data["history"][self.today]["completed"] = completed_tasks
-        self.data["history"][self.today]["total"] = total_tasks
-
-        save_data(self.data)
-        self.draw_contribution_map()
-        messagebox.showinfo("保存成功", "今日任务进度已保存！")
-
-    def delete_task(self):
-        selected_task = self.task_var.get()  # 获取当前选中的任务
-        if selected_task == "选择任务":
-            messagebox.showwarning("未选择任务", "请选择要删除的任务")
-            return
-
-        # 确认删除
-        confirm = messagebox.askyesno("确认删除", f"确定要删除任务: {selected_task} 吗？")
-        if confirm:
-            self.data["tasks"].remove(selected_task)  # 从任务列表删除
-            self.data["history"] = {  # 从所有历史数据中删除该任务
-                date: {task: value for task, value in history.items() if task != selected_task}
-                for date, history in self.data["history"].items()
-            }
-            save_data(self.data)  # 保存更新后的数据
-            self.load_tasks()  # 重新加载任务
-            self.update_task_menu()  # 更新 OptionMenu 选项
-            self.adjust_height()  # 重新调整窗口高度
-
-
-
-    def draw_month_labels(self, dates, start_x, cell_size, spacing):
-        month_positions = {}
-
-        # ✅ 右移月份 1.8 个 cell（仅限第二个及之后的月份）
-        month_offset_x = start_x + int(1.6 * (cell_size + spacing))
-        first_month = None  # 记录第一个出现的月份
-
-        for i, date in enumerate(dates):
-            date_obj = datetime.datetime.strptime(date, "%Y-%m-%d")
-            month = date_obj.strftime("%b")
-            year_month = date_obj.strftime("%Y-%b")  # 区分不同年份的相同月份
-            col = i // 7
-
-            if year_month not in month_positions:  # 确保同年同月不会被覆盖
-                if first_month is None:
-                    first_month = month  # 记录第一个出现的月份
-                    month_positions[year_month] = (
-                        start_x
-                        + int(0.6 * (cell_size + spacing))
-                        + col * (cell_size + spacing)
-                    )  # ✅ 首月稍微右移
-                else:
-                    month_positions[year_month] = month_offset_x + col * (
-                        cell_size + spacing
-                    )  # ✅ 其他月份右移
-
-        # ✅ 绘制月份名称
-        for year_month, x in month_positions.items():
-            month = year_month.split("-")[1]  # 只提取月份名
-            self.canvas.create_text(x, 10, text=month, font=("微软雅黑", 10))
-
-        # ✅ 仅显示 "Mon", "Wed", "Fri"，并左移防止重叠
-        offset_x = 8  # 左移 8 个像素
-        offset_y = 45  # 下移 8 个像素
-        self.canvas.create_text(
-            offset_x, offset_y, text="Mon", font=("微软雅黑", 10), anchor="w"
-        )
-        self.canvas.create_text(
-            offset_x,
-            offset_y + (cell_size + spacing) * 2,
-            text="Wed",
-            font=("微软雅黑", 10),
-            anchor="w",
-        )
-        self.canvas.create_text(
-            offset_x,
-            offset_y + (cell_size + spacing) * 4,
-            text="Fri",
-            font=("微软雅黑", 10),
-            anchor="w",
-        )
-
-    def on_hover(self, event):
-        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)  # 适配滚动条
-        for (x1, y1, x2, y2), (date, completed, total) in self.date_rects.items():
-            if x1 <= x <= x2 and y1 <= y <= y2:  # 判断鼠标是否在格子范围内
-                self.hover_text.set(f"{date}: {completed}/{total} 任务完成")
-                self.hover_label.lift()  # 🔹 确保 label 不会被其他 UI 遮挡
-                return
-        self.hover_text.set("")
-    
-
-    def change_year(self, selected_year):
-        self.current_year = int(selected_year)
-        self.draw_contribution_map()
-
-    def create_rounded_rect(
-        self, x1, y1, x2, y2, radius, fill_color, border_color="#D3D3D3", border_width=2
-    ):
-        """创建带圆角且带边框的矩形"""
-        # 计算边框偏移
-        offset = border_width / 2
-
-        # 1️⃣ 绘制比实际稍大的边框
-        self.canvas.create_oval(
-            x1 - offset,
-            y1 - offset,
-            x1 + radius * 2 + offset,
-            y1 + radius * 2 + offset,
-            fill=border_color,
-            outline=border_color,
-        )  # 左上角
-        self.canvas.create_oval(
-            x2 - radius * 2 - offset,
-            y1 - offset,
-            x2 + offset,
-            y1 + radius * 2 + offset,
-            fill=border_color,
-            outline=border_color,
-        )  # 右上角
-        self.canvas.create_oval(
-            x1 - offset,
-            y2 - radius * 2 - offset,
-            x1 + radius * 2 + offset,
-            y2 + offset,
-            fill=border_color,
-            outline=border_color,
-        )  # 左下角
-        self.canvas.create_oval(
-            x2 - radius * 2 - offset,
-            y2 - radius * 2 - offset,
-            x2 + offset,
-            y2 + offset,
-            fill=border_color,
-            outline=border_color,
-        )  # 右下角
-
-        self.canvas.create_rectangle(
-            x1 + radius - offset,
-            y1 - offset,
-            x2 - radius + offset,
-            y2 + offset,
-            fill=border_color,
-            outline=border_color,
-        )
-        self.canvas.create_rectangle(
-            x1 - offset,
-            y1 + radius - offset,
-            x2 + offset,
-            y2 - radius + offset,
-            fill=border_color,
-            outline=border_color,
-        )
-
-        # 2️⃣ 再绘制实际的圆角矩形（内部颜色）
-        self.canvas.create_oval(
-            x1,
-            y1,
-            x1 + radius * 2,
-            y1 + radius * 2,
-            fill=fill_color,
-            outline=fill_color,
-        )  # 左上角
-        self.canvas.create_oval(
-            x2 - radius * 2,
-            y1,
-            x2,
-            y1 + radius * 2,
-            fill=fill_color,
-            outline=fill_color,
-        )  # 右上角
-        self.canvas.create_oval(
-            x1,
-            y2 - radius * 2,
-            x1 + radius * 2,
-            y2,
-            fill=fill_color,
-            outline=fill_color,
-        )  # 左下角
-        self.canvas.create_oval(
-            x2 - radius * 2,
-            y2 - radius * 2,
-            x2,
-            y2,
-            fill=fill_color,
-            outline=fill_color,
-        )  # 右下角
-
-        self.canvas.create_rectangle(
-            x1 + radius, y1, x2 - radius, y2, fill=fill_color, outline=fill_color
-        )
-        self.canvas.create_rectangle(
-            x1, y1 + radius, x2, y2 - radius, fill=fill_color, outline=fill_color
-        )
-
-    def draw_contribution_map(self):
-        self.canvas.delete("all")
-        history = self.data["history"]
-
-
-        # ========== 📌 计算当前模式的日期范围 ==========
-        if self.current_year == today.year:
-            # ✅ 今年模式：显示 “今天” 之前的数据（动态计算）
-            end_date = today  # 截止日期是今天
-            start_date = today - datetime.timedelta(
-                days=7 * 52 + today.weekday() + 1
-            )  # 52周+最后一列天数
-
-            # ✅ 计算最后一列的行数（今天是星期几 - 周日）
-            weekday_today = today.weekday()  # 0 = Monday, ..., 6 = Sunday
-            last_col_rows = (weekday_today + 1) % 7 + 1  # 让 Sunday=0, Saturday=6
-
-            all_dates = [
-                (start_date + datetime.timedelta(days=i)).isoformat()
-                for i in range((end_date - start_date).days + 1)
-            ]
-            cols = 53  # 固定52列，最后一列的行数动态计算
-            rows = 7
-        else:
-            # ✅ 过往年份模式：显示 “当年01-01 到 12-31”
-            start_date = datetime.date(self.current_year, 1, 1)
-            end_date = datetime.date(self.current_year, 12, 31)
-            num_days = (end_date - start_date).days + 1
-
-            # ✅ 计算该年 01-01 是星期几
-            start_weekday = start_date.weekday()  # 0 = Monday, ..., 6 = Sunday
-            start_weekday = (start_weekday + 1) % 7  # 转换成 Sun - Sat 模式
-
-            all_dates = [
-                (start_date + datetime.timedelta(days=i)).isoformat()
-                for i in range(num_days)
-            ]
-            cols = (num_days + start_weekday) // 7 + 1  # 计算列数
-            rows = 7
-            last_col_rows = num_days % 7  # 最后一列的行数
-
-        # ========== 📌 计算每个格子的位置 ==========
-        cell_size = 15
-        radius = 3  # 圆角半径
-        spacing = 4
-        start_x, start_y = 10 + 1.8 * (cell_size + spacing), 20  # 右移 2 个 cell
-        colors = [
-            "#ebedf0",  # 0%  (无任务)
-            "#c6e48b",  # 10%
-            "#7bc96f",  # 25%
-            "#40c463",  # 50%
-            "#30a14e",  # 75%
-            "#216e39",  # 100%
-        ]           
-        self.date_rects = {}
-
-        for i, date in enumerate(all_dates):
-            count = sum(history.get(date, {}).values()) if date in history else 0
-            data = history.get(date, {})
-            completed = data.get("completed", 0)
-            total = data.get("total", 0)  
-
-            if(completed == 0):
-                completion_ratio = 0
-            else:
-                completion_ratio = completed / total
-
-            color_index = min(int(completion_ratio * (len(colors) - 1)), len(colors) - 1)
-            color = colors[color_index]
-
-            # ✅ 计算列、行索引
-            if self.current_year == today.year:
-                col = i // rows  # 普通列的计算
-                row = i % rows
-
-                if col == 52:  # 最后一列
-                    row = i - (52 * rows)  # 修正最后一列的行数
-
-            else:
-                col = (i + start_weekday) // rows  # 适配 01-01 是星期几
-                row = (i + start_weekday) % rows
-
-            # 计算坐标
-            x1 = start_x + col * (cell_size + spacing)
-            y1 = start_y + row * (cell_size + spacing)
-            x2 = x1 + cell_size
-            y2 = y1 + cell_size
-
-            # 使用自定义函数绘制圆角矩形
-            self.create_rounded_rect(x1, y1, x2, y2, radius, color)
-
-            # 记录坐标
-            self.date_rects[(x1, y1, x2, y2)] = (date, completed, total)
-
-        self.draw_month_labels(all_dates, start_x, cell_size, spacing)
-
-        # ✅ 计算正确的 `scrollregion`
-        max_width = start_x + cols * (cell_size + spacing)
-        self.canvas.config(scrollregion=(0, 0, max_width, 150))
-
-        # ✅ 默认滚动到最右侧
-        self.canvas.update_idletasks()  # 确保 Canvas 完成渲染
-        self.canvas.xview_moveto(1)  # 滚动到最右端
-
-    def get_available_years(self):
-        years = set()
-        for date in self.data["history"]:
-            year = date.split("-")[0]
-            years.add(year)
-        return sorted(years, reverse=True)  # 最新年份优先
-    
-    def schedule_date_check(self):
-        """每分钟检查日期是否变化，若变化则刷新 UI 并清除任务勾选"""
-        current_date = datetime.date.today().isoformat()
-        if current_date != self.today:
-            self.today = current_date
-            self.date_label.config(text=f"📅 今日日期: {self.today}")
-            self.data["history"].setdefault(self.today, {})  # 初始化今日数据为空
-            for task in self.data["tasks"]:
-                self.data["history"][self.today][task] = 0
-            save_data(self.data)
-            self.load_tasks()
-            self.draw_contribution_map()
-            print(f"🕒 日期已更新为 {self.today}，已清空勾选状态")
-    
-        # 再次安排下一次检查（60秒后）
-        self.root.after(60000, self.schedule_date_check)
-
-
-def generate_test_data():
-    data = {"tasks": ["测试任务"], "history": {}}
-    today = datetime.date.today()
-    current_year = today.year
-
-    for year in range(2022, current_year + 1):
-        start_date = datetime.date(year, 1, 1)
-
-        if year == current_year:
-            days = (today - start_date).days + 1
-        else:
-            days = 365
-
-        for i in range(days):
-            date = (start_date + datetime.timedelta(days=i)).isoformat()
-            completed = i % 5  # 随机完成数量
-            total = 5  # 假设每天总共有 5 个任务
-            data["history"][date] = {"completed": completed, "total": total}
-
-    save_data(data)
-
-if __name__ == "__main__":
-    # generate_test_data()
-
-    root = tk.Tk()
-
-    # 🔹 先设置默认宽度 500px，高度随意（之后会自动调整）
-    root.geometry("400x100")
-
-    # 置顶
-    root.attributes("-topmost", True)
-
-    app = TaskManager(root)  # 运行 Tkinter 主程序
-
-    # 使用 `after()` 方法，等界面完全加载后再调整高度
-    root.after(10, app.adjust_height)  # 100ms 后执行调整
-
-    root.mainloop()
+import tkinter as tk
+from tkinter import messagebox, simpledialog
+import datetime
+import os
+import queue
+import random
+import sys
+import time
+
+from file_watch import FileWatcher, diff_state
+from heatmap_render import (
+    CELL_PITCH,
+    CELL_RADIUS,
+    CELL_SIZE,
+    GRID_LEFT,
+    GRID_TOP,
+    MONTH_LABEL_Y,
+    ROWS,
+    WEEKDAY_LABELS,
+    HeatmapGridCache,
+    cell_origin,
+    cell_rows,
+    photo_rows,
+    rasterize,
+    view_range,
+)
+from instrumentation import TRACE_FILE, TRACER, traced
+from task_checklist import TaskChecklist
+from task_picker import TaskPicker
+from task_profiles import DEFAULT_PROFILE, create_profile, list_profiles, open_profile
+from task_stats import format_summary, load_stats
+from task_storage import (
+    BackgroundWriter,
+    apply_record,
+    checked_day,
+    checked_tasks,
+    encode_mask,
+    get_storage,
+    task_bits,
+    tasks_mask,
+    translate_day,
+)
+
+PROFILE_STARTUP = os.environ.get("DAILY_TASK_PROFILE_STARTUP") == "1"  # 打印启动各阶段耗时
+RENDER_MODES = ("vector", "raster")  # 热力图画法：每格一组画布部件 / 整张图一个 PhotoImage
+RENDER_MODE = os.environ.get("DAILY_TASK_RENDER", "vector")
+IDLE_CHUNK_COLUMNS = 8  # 热力图首屏之外，每个空闲回调画几周
+TIMELINE_LABEL = "全部"  # 年份菜单中的连续时间线选项
+TIMELINE_MARGIN_COLUMNS = 4  # 时间线模式下视口两侧额外保留的列数
+RELOAD_DELAY_MS = 200  # 数据文件变化后等多久再读取（合并连续的变化事件）
+EVENT_POLL_MS = 100  # 主线程多久检查一次后台线程（文件监视、写盘）发来的事件
+CLOCK_CHECK_MS = 5 * 60 * 1000  # 跨天定时器最长间隔：休眠唤醒 / 调整系统时间后最迟这么久重新对准午夜
+OVERLAY_REFRESH_MS = 1000  # 调试面板刷新间隔（DAILY_TASK_TRACE=1 时 F12 打开）
+
+
+class StartupProfiler:
+    """启动各阶段计时：mark(阶段) 记录距上一阶段的耗时，finish() 打印汇总（未开启时什么都不做）"""
+
+    def __init__(self, enabled=PROFILE_STARTUP):
+        self.enabled = enabled
+        self.start = self.last = time.perf_counter()
+        self.phases = []
+
+    def mark(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last, now - self.start))
+        self.last = now
+
+    def finish(self):
+        if not self.enabled:
+            return
+        self.enabled = False  # 只汇报一次
+        print("⏱ 启动耗时（阶段 / 本阶段 / 累计）:")
+        for phase, elapsed, total in self.phases:
+            print(f"  {phase:<20} {elapsed * 1000:8.1f} ms {total * 1000:8.1f} ms")
+
+# 加载任务数据（具体存储方式见 task_storage，由 DAILY_TASK_STORAGE 选择）
+def load_data():
+    return get_storage().load()
+
+
+# 保存任务数据
+def save_data(data):
+    get_storage().save(data)
+
+# 任务管理类
+class TaskManager:
+    def __init__(self, root, storage=None, render=None, master=None):
+        render = render or RENDER_MODE  # 先校验参数，再打开存储、启动后台线程和定时器
+        if render not in RENDER_MODES:
+            raise ValueError(f"未知的热力图画法: {render}（可选: {', '.join(RENDER_MODES)}）")
+        self.root = root
+        self.master = master or root  # 控件的父容器（多个配置共用一个窗口时为各自的 Frame）
+        if master is None:
+            self.root.title("每日任务追踪")
+        self.profiler = StartupProfiler()
+
+        self.storage = storage or get_storage()
+        with TRACER.span("load_data"):
+            self.data = self.storage.load()
+        self.profiler.mark("load_data")
+        self.events = queue.Queue()  # 后台线程发给界面的回调：后台线程不直接调用 Tk，由主线程轮询执行
+        self.event_job = self.root.after(EVENT_POLL_MS, self.poll_events)
+        self.writer = BackgroundWriter(  # 写盘不阻塞界面
+            self.storage, on_error=self.report_save_error, on_written=self.record_own_write
+        )
+        if master is None:  # 共用窗口时由 ProfileWorkspace 负责关闭
+            self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.grid_cache = HeatmapGridCache()
+        self.grid = None  # 当前视图的格子（首次绘制前为 None）
+        self.hover_date = None  # 悬停提示当前对应的日期（热力图在空闲时才画，事件可能先到）
+        self.drawn_layout = None  # 画布上当前的布局
+        self.cell_items = []
+        self.draw_chunks = []  # 还没画出来的格子范围 (起, 止)，从右往左
+        self.draw_job = None
+        self.raster = render == "raster"  # 光栅模式：画布上只有一个图片部件
+        self.photo = None
+        self.today = datetime.date.today().isoformat()
+
+        # 设置当前年（None 表示连续时间线）
+        self.current_year = datetime.date.today().year
+        self.timeline_slots = None  # 时间线模式：列号 -> 可回收的列（画布部件）
+
+        self.create_widgets()
+        self.profiler.mark("create_widgets")
+        self.load_tasks()
+        self.load_today()
+        self.profiler.mark("load_tasks")
+
+        # ✅ 监视数据文件：其他窗口或手动编辑修改后，只把变化的任务 / 日期应用到界面
+        self.reload_job = None
+        self.watcher = FileWatcher(self.storage.watch_paths(), self.on_external_change)
+        self.own_signature = self.watcher.stat_all()  # 自己最近一次写盘后的文件状态
+
+        # ✅ 先让任务列表显示出来，热力图在事件循环空闲时再逐步画，统计等热力图画完再算
+        self.root.after_idle(self.draw_contribution_map)
+        self.date_job = None
+        self.schedule_date_check()
+        self.root.bind("<FocusIn>", self.on_focus_in, add="+")  # 唤醒后回到窗口时立即检查日期
+
+        # ✅ 性能追踪（DAILY_TASK_TRACE=1）：F12 显示调试面板，Ctrl+Shift+T 导出 trace
+        self.overlay = None
+        self.overlay_job = None
+        if TRACER.enabled:
+            self.root.bind("<F12>", lambda event: self.toggle_overlay())
+            self.root.bind("<Control-T>", lambda event: self.dump_trace())
+
+    # 后台写入线程中调用：放进队列，由 Tk 主线程弹窗（关闭时在写入线程结束后弹出）
+    def report_save_error(self, error):
+        self.events.put(lambda: messagebox.showerror("保存失败", f"任务数据写入失败: {error}"))
+
+    # 关闭窗口前把尚未写盘的修改写完
+    def on_close(self):
+        self.close()
+        if TRACER.enabled:
+            self.dump_trace()
+        self.root.destroy()
+
+    def close(self):
+        self.writer.close()  # 先写完剩余的修改（写盘会触发文件监视），再停止监视
+        self.watcher.close()
+        if self.event_job is not None:
+            self.root.after_cancel(self.event_job)
+            self.event_job = None
+        self.storage.close()
+        self.process_events()  # 两个线程都已结束：最后一次写盘失败的提示在这里弹出
+
+    def poll_events(self):
+        self.process_events()
+        self.event_job = self.root.after(EVENT_POLL_MS, self.poll_events)
+
+    def process_events(self):
+        """在 Tk 主线程执行后台线程放进队列的回调"""
+        while True:
+            try:
+                callback = self.events.get_nowait()
+            except queue.Empty:
+                return
+            callback()
+
+    # 调整窗口
+    def adjust_height(self):
+        self.root.update_idletasks()  # 强制刷新窗口尺寸计算
+        new_height = self.root.winfo_reqheight()  # 获取内容所需的高度
+        self.root.geometry(f"400x{new_height}")  # 仅修改高度，宽度不变
+
+    def create_widgets(self):
+        # 📌 任务管理区域（加边框）
+        self.task_frame = tk.LabelFrame(
+            self.master, text="任务管理", font=("微软雅黑", 12, "bold"), padx=10, pady=10
+        )
+        self.task_frame.pack(fill="x", padx=10, pady=10)
+
+        # 📌 在任务管理区域上方添加 "今日日期"
+        self.date_label = tk.Label(
+            self.task_frame,
+            text=f"📅 今日日期: {self.today}",
+            font=("微软雅黑", 12, "bold"),
+            fg="black",
+        )
+        self.date_label.pack(anchor="w", pady=(0, 5))  # 🔹 让日期靠左，增加底部间距
+
+        # 📌 冲突提示（今日进度被其他窗口修改、而本窗口还有未保存的勾选时显示）
+        self.conflict_label = tk.Label(
+            self.task_frame,
+            text="⚠ 今日进度已在其他地方修改，保存时以本窗口为准",
+            font=("微软雅黑", 10),
+            fg="red",
+        )
+
+        # ✅ 按钮行
+        button_frame = tk.Frame(self.task_frame)
+        button_frame.pack(fill="x", pady=5)
+
+        self.add_task_button = tk.Button(
+            button_frame,
+            text="➕ 添加任务",
+            font=("微软雅黑", 12, "bold"),
+            padx=10,
+            pady=5,
+            command=self.add_task,
+        )
+        self.add_task_button.pack(side="left", padx=5, pady=5)
+
+        self.save_button = tk.Button(
+            button_frame,
+            text="💾 保存进度",
+            font=("微软雅黑", 12, "bold"),
+            padx=10,
+            pady=5,
+            command=self.save_progress,
+        )
+        self.save_button.pack(side="left", padx=5, pady=5)
+
+        # 📌 任务列表区域（任务多时可滚动，只创建一屏的复选框）
+        self.checklist = TaskChecklist(self.task_frame)
+
+        # ✅ 任务选择 & 删除按钮行
+        task_delete_frame = tk.Frame(self.task_frame)
+        task_delete_frame.pack(fill="x", pady=5)
+
+        # 📌 任务删除按钮
+        self.delete_task_button = tk.Button(
+            task_delete_frame,
+            text="🗑 删除任务",
+            font=("微软雅黑", 12, "bold"),
+            padx=10,
+            pady=5,
+            command=self.delete_task,
+        )
+        self.delete_task_button.pack(side="left", padx=5, pady=5)  # 🔹 让按钮靠左，间距相同
+
+        # 📌 任务选择框：输入任务名的一部分即可筛选（任务多时不必翻长菜单）
+        self.task_var = tk.StringVar()
+        self.task_picker = TaskPicker(task_delete_frame, self.task_var, on_resize=self.adjust_height)
+
+        # 📌 撤销删除按钮（删除任务后才可用）
+        self.last_deleted = None  # (任务名, 原位置)
+        self.undo_delete_button = tk.Button(
+            task_delete_frame,
+            text="↩ 撤销",
+            font=("微软雅黑", 12, "bold"),
+            padx=10,
+            pady=5,
+            state="disabled",
+            command=self.undo_delete,
+        )
+        self.undo_delete_button.pack(side="left", padx=5, pady=5)
+
+
+        # 📌 热力图区域（用 LabelFrame 包裹，保证布局稳定，并添加标题和边框）
+        self.canvas_container = tk.LabelFrame(
+            self.master, text="热力图", font=("微软雅黑", 12, "bold"), bd=2, relief="ridge"
+        )  # ✅ 使用 LabelFrame
+        self.canvas_container.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # 📌 年份选择框 + 任务进度悬停提示（放在同一行）
+        self.year_hover_frame = tk.Frame(
+            self.canvas_container
+        )  # 🔹 创建一个新 Frame 作为容器
+        self.year_hover_frame.pack(
+            side="top", anchor="w", fill="x", padx=10, pady=5
+        )  # 🔹 让它位于热力图顶部
+
+        # 📌 年份选择框（左侧）
+        self.year_var = tk.StringVar(value=str(datetime.date.today().year))
+        self.year_menu = tk.OptionMenu(
+            self.year_hover_frame,
+            self.year_var,
+            *self.get_available_years(),
+            TIMELINE_LABEL,
+            command=self.change_year,
+        )
+        self.year_menu.config(font=("微软雅黑", 12, "bold"), padx=10, pady=5)
+        self.year_menu.pack(side="left", padx=5)  # 🔹 让年份选择框靠左
+
+        # 📌 任务筛选（年份选择框右侧）：只按选中的任务给格子着色，可多选
+        self.filter_tasks = set()
+        self.filter_vars = {}
+        self.filter_menu_tasks = None  # 菜单当前对应的任务列表，任务列表不变时不重建菜单
+        self.filter_button = tk.Menubutton(
+            self.year_hover_frame,
+            text="🔍 全部任务",
+            font=("微软雅黑", 12, "bold"),
+            relief="raised",
+            padx=10,
+            pady=5,
+        )
+        self.filter_menu = tk.Menu(self.filter_button, tearoff=0)
+        self.filter_button.config(menu=self.filter_menu)
+        self.filter_button.pack(side="left", padx=5)
+
+        # 📌 空白填充 Frame → 让 hover 提示居中
+        self.spacer = tk.Label(self.year_hover_frame)
+        self.spacer.pack(
+            side="left", expand=True
+        )  # 🔹 自动填充空白区域，使 hover 提示居中
+
+        # 📌 任务进度悬停提示（居中）
+        self.hover_text = tk.StringVar()
+        self.hover_label = tk.Label(
+            self.year_hover_frame,
+            textvariable=self.hover_text,
+            font=("微软雅黑", 12, "bold"),
+            fg="black",
+        )
+        self.hover_label.pack(side="left")  # 🔹 放在中间区域
+
+        # 📌 右侧填充 Frame → 确保 hover_text 保持居中
+        self.spacer_right = tk.Label(self.year_hover_frame)
+        self.spacer_right.pack(
+            side="right", expand=True
+        )  # 🔹 自动填充空白区域，使 hover 提示居中
+
+        # 📌 Canvas 热力图区域（现在在年份选择框下方）
+        self.canvas_frame = tk.Frame(self.canvas_container)
+        self.canvas_frame.pack(
+            side="top", fill="both", expand=True, padx=15, pady=15
+        )  # 🔹 让它位于年份选择框下方
+
+        self.canvas = tk.Canvas(
+            self.canvas_frame,
+            width=800,
+            height=160,
+            bg="white",
+            scrollregion=(0, 0, 2000, 150),
+        )
+        self.scroll_x = tk.Scrollbar(
+            self.canvas_frame, orient="horizontal", command=self.canvas.xview
+        )
+        self.canvas.configure(xscrollcommand=self.on_xscroll)
+
+        self.canvas.pack(side="top", fill="both", expand=True)
+        self.scroll_x.pack(side="bottom", fill="x")
+
+        self.canvas.bind("<Motion>", self.on_hover)
+        self.canvas.bind("<Configure>", lambda event: self.update_timeline())
+
+        # 📌 统计概览（连续天数、完成率），热力图下方
+        self.stats = None  # 热力图第一次画完后在空闲时构建
+        self.stats_job = None
+        self.stats_text = tk.StringVar()
+        self.stats_label = tk.Label(
+            self.canvas_container, textvariable=self.stats_text, font=("微软雅黑", 11), fg="#555555"
+        )
+        self.stats_label.pack(side="top", pady=(0, 10))
+        
+    @traced("load_tasks")
+    def load_tasks(self):
+        """按任务列表更新勾选列表（只改动增删 / 换位的行，未保存的勾选保留）"""
+        self.checklist.set_tasks(self.data["tasks"])
+
+        # ✅ 更新任务下拉菜单和热力图筛选菜单
+        self.update_task_picker()
+        self.update_filter_menu()
+
+    def load_today(self):
+        """按今日已保存的位图设置勾选状态"""
+        self.saved_checked = set(checked_tasks(self.data, self.today))  # 已保存的勾选
+        self.checklist.set_checked(self.saved_checked)
+
+    def update_task_picker(self):
+        """更新任务选择框的索引（只处理增删的任务）"""
+        self.task_picker.set_tasks(self.data["tasks"])
+
+        # 当前选中的任务已不存在 → 选择第一个任务
+        if self.task_var.get() not in self.data["tasks"]:
+            self.task_picker.select(self.data["tasks"][0] if self.data["tasks"] else "")
+
+    def update_filter_menu(self):
+        """更新热力图任务筛选菜单（已删除的任务从筛选中去掉），任务列表没变时什么都不做"""
+        tasks = tuple(self.data["tasks"])
+        if tasks == self.filter_menu_tasks:
+            return  # 勾选状态由 toggle / clear 直接维护，菜单无需重建
+        self.filter_menu_tasks = tasks
+        remaining = self.filter_tasks & set(self.data["tasks"])
+        changed = remaining != self.filter_tasks
+        self.filter_tasks = remaining
+
+        self.filter_menu.delete(0, "end")
+        self.filter_menu.add_command(label="全部任务", command=self.clear_task_filter)
+        self.filter_menu.add_separator()
+        self.filter_vars = {}
+        for task in self.data["tasks"]:
+            var = tk.BooleanVar(value=task in self.filter_tasks)
+            self.filter_menu.add_checkbutton(
+                label=task, variable=var, command=lambda task=task: self.toggle_task_filter(task)
+            )
+            self.filter_vars[task] = var
+        self.update_filter_label()
+        if changed:
+            self.draw_contribution_map()
+
+    def update_filter_label(self):
+        if not self.filter_tasks:
+            text = "🔍 全部任务"
+        elif len(self.filter_tasks) == 1:
+            text = f"🔍 {next(iter(self.filter_tasks))}"
+        else:
+            text = f"🔍 {len(self.filter_tasks)} 个任务"
+        self.filter_button.config(text=text)
+
+    def toggle_task_filter(self, task):
+        if self.filter_vars[task].get():
+            self.filter_tasks.add(task)
+        else:
+            self.filter_tasks.discard(task)
+        self.update_filter_label()
+        self.draw_contribution_map()
+
+    def clear_task_filter(self):
+        self.filter_tasks.clear()
+        for var in self.filter_vars.values():
+            var.set(False)
+        self.update_filter_label()
+        self.draw_contribution_map()
+
+    def add_task(self):
+        task = simpledialog.askstring("添加任务", "输入新任务:")
+        if task and task not in self.data["tasks"]:
+            self.writer.save_change(self.data, {"op": "add_task", "task": task})
+            self.load_tasks()
+            self.checklist.scroll_to(len(self.data["tasks"]))  # 滚到底部，显示新任务
+            self.adjust_height()  # 调整窗口高度
+
+    def save_progress(self):
+        # ✅ 完成数、当天任务总数和每个任务的勾选状态（位图）一起保存
+        checked = self.checklist.get_checked()
+        day = checked_day(self.data, self.today, checked)
+
+        self.writer.save_change(self.data, {"op": "save_day", "date": self.today, "day": day})
+        self.saved_checked = checked
+        self.conflict_label.pack_forget()
+        self.update_date_cell(self.today)  # 只重新着色今天的格子
+        self.update_stats({self.today: day})
+        messagebox.showinfo("保存成功", "今日任务进度已保存！")
+
+    def delete_task(self):
+        selected_task = self.task_var.get()  # 获取当前选中的任务
+        if selected_task not in self.data["tasks"]:
+            messagebox.showwarning("未选择任务", "请选择要删除的任务")
+            return
+
+        # 确认删除
+        confirm = messagebox.askyesno("确认删除", f"确定要删除任务: {selected_task} 吗？")
+        if confirm:
+            # 只从任务列表移除并打上墓碑，历史记录留到压缩时再清理
+            position = self.data["tasks"].index(selected_task)
+            self.writer.save_change(self.data, {"op": "delete_task", "task": selected_task})
+            self.last_deleted = (selected_task, position)
+            self.undo_delete_button.config(state="normal")
+            self.load_tasks()  # 重新加载任务（同时更新 OptionMenu 选项）
+            self.adjust_height()  # 重新调整窗口高度
+
+    def undo_delete(self):
+        """撤销最近一次删除：历史记录尚未清理，直接放回原位置"""
+        if self.last_deleted is None:
+            return
+        task, position = self.last_deleted
+        self.last_deleted = None
+        self.undo_delete_button.config(state="disabled")
+        if task in self.data["tasks"]:  # 已经被重新添加
+            return
+
+        self.writer.save_change(
+            self.data, {"op": "restore_task", "task": task, "position": position}
+        )
+        self.load_tasks()
+        self.adjust_height()
+
+
+
+    def draw_month_labels(self, layout):
+        # ✅ 月份名称（位置已在布局中按每月 1 日所在列算好）
+        for x, month in layout.month_labels:
+            self.canvas.create_text(x, MONTH_LABEL_Y, text=month, font=("微软雅黑", 10), tags="label")
+
+        # ✅ 仅显示 "Mon", "Wed", "Fri"，并左移防止重叠
+        for text, x, y in WEEKDAY_LABELS:
+            self.canvas.create_text(x, y, text=text, font=("微软雅黑", 10), anchor="w", tags="label")
+
+    def cell_at(self, x, y):
+        """(x, y) 所在的格子 (日期, 完成数, 总数, 颜色)，不在格子内返回 None"""
+        if self.grid is None:
+            return None
+        i = self.grid.layout.index_at(x, y)
+        return None if i is None else self.grid.cell(i)
+
+    def on_hover(self, event):
+        TRACER.count("on_hover")
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)  # 适配滚动条
+        cell = self.cell_at(x, y)
+        date = cell[0] if cell else None
+        if date == self.hover_date:  # 仍在同一个格子里 → 无需更新
+            return
+        self.hover_date = date
+
+        if cell is None:
+            self.hover_text.set("")
+            return
+        date, completed, total, _ = cell
+        text = f"{date}: {completed}/{total} 任务完成"
+        if self.stats is not None and completed:
+            text += f" · 连续第 {self.stats.streak(date)[0]} 天"
+        self.hover_text.set(text)
+        self.hover_label.lift()  # 🔹 确保 label 不会被其他 UI 遮挡
+    
+
+    def update_year_menu(self):
+        """按当前有数据的年份重建年份菜单"""
+        menu = self.year_menu["menu"]
+        menu.delete(0, "end")
+        for year in [*self.get_available_years(), TIMELINE_LABEL]:
+            menu.add_command(label=year, command=lambda value=year: self.select_year(value))
+
+    def select_year(self, value):
+        self.year_var.set(value)
+        self.change_year(value)
+
+    def change_year(self, selected_year):
+        self.current_year = None if selected_year == TIMELINE_LABEL else int(selected_year)
+        self.draw_contribution_map()
+
+    def create_rounded_rect(
+        self,
+        x1,
+        y1,
+        x2,
+        y2,
+        radius,
+        fill_color,
+        border_color="#D3D3D3",
+        border_width=2,
+        tag=None,
+    ):
+        """创建带圆角且带边框的矩形
+
+        tag: 格子标签，边框部件标记为 tag，内部填充部件标记为 f"{tag}_fill"
+        返回内部填充部件的 id 列表，之后可直接按 id 用 itemconfig 改色，无需重建
+        """
+        border_tags = (tag,) if tag else ()
+        fill_tags = (tag, f"{tag}_fill") if tag else ()
+
+        # 计算边框偏移
+        offset = border_width / 2
+
+        # 1️⃣ 绘制比实际稍大的边框
+        self.canvas.create_oval(
+            x1 - offset,
+            y1 - offset,
+            x1 + radius * 2 + offset,
+            y1 + radius * 2 + offset,
+            fill=border_color,
+            outline=border_color,
+            tags=border_tags,
+        )  # 左上角
+        self.canvas.create_oval(
+            x2 - radius * 2 - offset,
+            y1 - offset,
+            x2 + offset,
+            y1 + radius * 2 + offset,
+            fill=border_color,
+            outline=border_color,
+            tags=border_tags,
+        )  # 右上角
+        self.canvas.create_oval(
+            x1 - offset,
+            y2 - radius * 2 - offset,
+            x1 + radius * 2 + offset,
+            y2 + offset,
+            fill=border_color,
+            outline=border_color,
+            tags=border_tags,
+        )  # 左下角
+        self.canvas.create_oval(
+            x2 - radius * 2 - offset,
+            y2 - radius * 2 - offset,
+            x2 + offset,
+            y2 + offset,
+            fill=border_color,
+            outline=border_color,
+            tags=border_tags,
+        )  # 右下角
+
+        self.canvas.create_rectangle(
+            x1 + radius - offset,
+            y1 - offset,
+            x2 - radius + offset,
+            y2 + offset,
+            fill=border_color,
+            outline=border_color,
+            tags=border_tags,
+        )
+        self.canvas.create_rectangle(
+            x1 - offset,
+            y1 + radius - offset,
+            x2 + offset,
+            y2 - radius + offset,
+            fill=border_color,
+            outline=border_color,
+            tags=border_tags,
+        )
+
+        # 2️⃣ 再绘制实际的圆角矩形（内部颜色）
+        fill_items = []
+        fill_items.append(
+            self.canvas.create_oval(
+                x1,
+                y1,
+                x1 + radius * 2,
+                y1 + radius * 2,
+                fill=fill_color,
+                outline=fill_color,
+                tags=fill_tags,
+            )
+        )  # 左上角
+        fill_items.append(
+            self.canvas.create_oval(
+                x2 - radius * 2,
+                y1,
+                x2,
+                y1 + radius * 2,
+                fill=fill_color,
+                outline=fill_color,
+                tags=fill_tags,
+            )
+        )  # 右上角
+        fill_items.append(
+            self.canvas.create_oval(
+                x1,
+                y2 - radius * 2,
+                x1 + radius * 2,
+                y2,
+                fill=fill_color,
+                outline=fill_color,
+                tags=fill_tags,
+            )
+        )  # 左下角
+        fill_items.append(
+            self.canvas.create_oval(
+                x2 - radius * 2,
+                y2 - radius * 2,
+                x2,
+                y2,
+                fill=fill_color,
+                outline=fill_color,
+                tags=fill_tags,
+            )
+        )  # 右下角
+
+        fill_items.append(
+            self.canvas.create_rectangle(
+                x1 + radius,
+                y1,
+                x2 - radius,
+                y2,
+                fill=fill_color,
+                outline=fill_color,
+                tags=fill_tags,
+            )
+        )
+        fill_items.append(
+            self.canvas.create_rectangle(
+                x1,
+                y1 + radius,
+                x2,
+                y2 - radius,
+                fill=fill_color,
+                outline=fill_color,
+                tags=fill_tags,
+            )
+        )
+
+        TRACER.count("canvas_items_created", len(fill_items) * 2)  # 边框、填充各一组
+        return fill_items  # 内部填充部件的 id，之后改色用
+
+    @traced("draw_contribution_map")
+    def draw_contribution_map(self):
+        # ✅ 今年模式显示截至今天的最近 53 周，过往年份显示当年 01-01 到 12-31，时间线显示全部历史
+        if self.current_year is None:
+            start_date, end_date = self.timeline_range()
+        else:
+            start_date, end_date = view_range(self.current_year, datetime.date.fromisoformat(self.today))
+
+        # ✅ 当前视图的格子（按日期范围 + 任务筛选缓存，只在首次查看时读取历史、计算颜色）
+        task_mask = tasks_mask(self.data, self.filter_tasks) if self.filter_tasks else None
+        self.grid = self.grid_cache.get(
+            start_date,
+            end_date,
+            lambda start, end: self.storage.history_range(self.data, start, end),
+            task_mask,
+        )
+        self.hover_date = None
+        layout = self.grid.layout  # 坐标、月份标签、滚动区域都已缓存
+
+        if self.raster:
+            self.draw_raster()
+            return
+
+        # ✅ 画布上已经是同一布局 → 只需重新着色（还没画出的格子之后按新颜色画）
+        if self.drawn_layout is layout:
+            for i in range(self.grid.size):
+                self.recolor_cell(i)
+            return
+
+        if self.draw_job is not None:  # 上一个视图还没画完
+            self.root.after_cancel(self.draw_job)
+            self.draw_job = None
+        self.canvas.delete("all")
+        self.cell_items = [None] * self.grid.size  # 每格内部填充部件的 id，按 id 改色无需按标签搜索
+        self.draw_chunks = []
+        self.timeline_slots = {} if self.current_year is None else None
+
+        self.draw_month_labels(layout)
+
+        # ✅ 计算正确的 `scrollregion`
+        self.canvas.config(scrollregion=layout.scrollregion)
+        self.drawn_layout = layout
+
+        # ✅ 默认滚动到最右侧
+        self.canvas.update_idletasks()  # 确保 Canvas 完成渲染
+        self.canvas.xview_moveto(1)  # 滚动到最右端
+
+        # ✅ 时间线模式：只为视口附近的列创建部件，滚动时回收复用
+        if self.timeline_slots is not None:
+            self.update_timeline()
+            self.schedule_stats()
+            return
+
+        # ✅ 按列从右往左分批画：首屏可见的几十周立即画，更早的周放到空闲回调里
+        hi, width = layout.columns, int(self.canvas["width"]) // CELL_PITCH + 1
+        self.draw_chunks = []
+        while hi > 0:
+            lo = max(hi - width, 0)
+            self.draw_chunks.append((max(lo * ROWS - layout.offset, 0), min(hi * ROWS - layout.offset, self.grid.size)))
+            hi, width = lo, IDLE_CHUNK_COLUMNS
+
+        self.draw_cells(*self.draw_chunks.pop(0))
+        self.profiler.mark("first_paint")
+        self.draw_job = self.root.after_idle(self.draw_next_chunk)
+
+    def draw_raster(self):
+        """光栅模式：格子（含圆角、边框）和标签一起画进一张 PhotoImage，部件数与显示的天数无关"""
+        layout = self.grid.layout
+        width, height, rows = rasterize(self.grid)
+        if self.photo is None or (self.photo.width(), self.photo.height()) != (width, height):
+            self.photo = tk.PhotoImage(master=self.canvas, width=width, height=height)
+            self.canvas.delete("all")
+            self.canvas.create_image(0, 0, image=self.photo, anchor="nw")
+        self.photo.put(photo_rows(rows))  # 所有行一次写入
+
+        if self.drawn_layout is not layout:
+            self.canvas.config(scrollregion=layout.scrollregion)
+            self.drawn_layout = layout
+            self.canvas.update_idletasks()
+            self.canvas.xview_moveto(1)  # 换了视图时滚动到最右端
+        self.profiler.mark("first_paint")
+        self.profiler.finish()
+        self.schedule_stats()
+        if TRACER.enabled:
+            TRACER.gauge("canvas_items", len(self.canvas.find_all()))
+
+    @traced("draw_cells")
+    def draw_cells(self, start, end):
+        layout = self.grid.layout
+        for i in range(start, end):
+            x1, y1, x2, y2 = layout.boxes[i]
+            # 使用自定义函数绘制圆角矩形（按日期打标签，便于单格改色）
+            self.cell_items[i] = self.create_rounded_rect(
+                x1, y1, x2, y2, CELL_RADIUS, self.grid.color(i), tag=f"cell_{layout.dates[i]}"
+            )
+
+    def draw_next_chunk(self):
+        """空闲回调：再画一批更早的周，全部画完后结束启动计时"""
+        self.draw_job = None
+        if self.draw_chunks:
+            self.draw_cells(*self.draw_chunks.pop(0))
+        if self.draw_chunks:
+            self.draw_job = self.root.after_idle(self.draw_next_chunk)
+        else:
+            self.profiler.mark("heatmap_complete")
+            self.profiler.finish()
+            self.schedule_stats()
+            if TRACER.enabled:
+                TRACER.gauge("canvas_items", len(self.canvas.find_all()))
+
+    def finish_drawing(self):
+        """立即画完所有剩余的格子（基准测试等需要完整画布时使用）"""
+        if self.draw_job is not None:
+            self.root.after_cancel(self.draw_job)
+            self.draw_job = None
+        while self.draw_chunks:
+            self.draw_cells(*self.draw_chunks.pop(0))
+        self.schedule_stats()
+
+    def timeline_range(self):
+        """时间线模式的日期范围：最早有记录的年份 1 月 1 日 ~ 今天"""
+        today = datetime.date.fromisoformat(self.today)
+        years = self.get_available_years()
+        first_year = int(years[-1]) if years else today.year
+        return datetime.date(first_year, 1, 1), today
+
+    def on_xscroll(self, first, last):
+        self.scroll_x.set(first, last)
+        self.update_timeline()
+
+    def update_timeline(self):
+        """按当前视口分配列：离开视口的列挪给新进入视口的列（只移动、改色，不新建部件）"""
+        if self.timeline_slots is None:
+            return
+        layout = self.grid.layout
+        width = max(self.canvas.winfo_width(), int(self.canvas["width"]))
+        left, right = self.canvas.canvasx(0), self.canvas.canvasx(width)
+        first = max(int((left - GRID_LEFT) // CELL_PITCH) - TIMELINE_MARGIN_COLUMNS, 0)
+        last = min(int((right - GRID_LEFT) // CELL_PITCH) + TIMELINE_MARGIN_COLUMNS, layout.columns - 1)
+
+        free = [col for col in self.timeline_slots if not first <= col <= last]
+        for col in range(first, last + 1):
+            if col in self.timeline_slots:
+                continue
+            if free:
+                slot = self.timeline_slots.pop(free.pop())
+                self.move_timeline_slot(slot, col)
+            else:
+                slot = self.create_timeline_slot(col)
+            self.timeline_slots[col] = slot
+
+    def create_timeline_slot(self, col):
+        """新建一列（7 个格子），每格一个标签，便于整体移动 / 隐藏"""
+        slot = {"col": col, "tags": [], "fills": []}
+        for row in range(ROWS):
+            tag = f"slot{len(self.timeline_slots)}_{row}"
+            x1, y1 = GRID_LEFT + col * CELL_PITCH, GRID_TOP + row * CELL_PITCH
+            fills = self.create_rounded_rect(
+                x1, y1, x1 + CELL_SIZE, y1 + CELL_SIZE, CELL_RADIUS, "white", tag=tag
+            )
+            slot["tags"].append(tag)
+            slot["fills"].append(fills)
+        self.show_timeline_slot(slot)
+        return slot
+
+    def move_timeline_slot(self, slot, col):
+        self.release_timeline_slot(slot)
+        dx = (col - slot["col"]) * CELL_PITCH
+        for tag in slot["tags"]:
+            self.canvas.move(tag, dx, 0)
+        slot["col"] = col
+        self.show_timeline_slot(slot)
+
+    def release_timeline_slot(self, slot):
+        for row in range(ROWS):
+            i = slot["col"] * ROWS + row - self.grid.layout.offset
+            if 0 <= i < self.grid.size and self.cell_items[i] is slot["fills"][row]:
+                self.cell_items[i] = None
+
+    def show_timeline_slot(self, slot):
+        """把列中每格对应到当天的数据并着色，超出日期范围的格子隐藏"""
+        for row in range(ROWS):
+            i = slot["col"] * ROWS + row - self.grid.layout.offset
+            if 0 <= i < self.grid.size:
+                self.cell_items[i] = slot["fills"][row]
+                self.canvas.itemconfig(slot["tags"][row], state="normal")
+                self.recolor_cell(i)
+            else:
+                self.canvas.itemconfig(slot["tags"][row], state="hidden")
+
+    def recolor_cell(self, i):
+        if self.raster:  # 只重写这一格的像素
+            if self.drawn_layout is self.grid.layout:
+                self.photo.put(photo_rows(cell_rows(int(self.grid.buckets[i]))), to=cell_origin(self.grid.layout, i))
+            return
+        if self.cell_items[i] is None:  # 还没画出来，画的时候会取最新颜色
+            return
+        color = self.grid.color(i)
+        for item in self.cell_items[i]:
+            self.canvas.itemconfig(item, fill=color, outline=color)
+
+    def update_date_cell(self, date):
+        """某天数据变化：更新格子缓存，并只重新着色这一格（不在当前视图中则不用画）"""
+        data = self.data["history"].get(date, {})
+        self.grid_cache.update(date, data)
+        if self.grid is None:
+            return
+        i = self.grid.index_of(date)
+        if i is None:
+            return
+
+        self.recolor_cell(i)
+
+        if date == self.hover_date:  # 悬停提示也要跟着刷新
+            self.hover_date = None
+
+    # ========== 📌 统计 ==========
+
+    def schedule_stats(self):
+        """热力图第一次画完后再统计整个历史
+
+        不能在启动时就放进空闲队列：首屏绘制中的 update_idletasks 会把它提前执行，整段历史扫描就挡在了首屏前面
+        """
+        if self.stats is None and self.stats_job is None:
+            self.stats_job = self.root.after_idle(self.load_stats)
+
+    def load_stats(self):
+        """统计整个历史（只做一次），之后随保存进度等增量更新"""
+        self.stats_job = None
+        self.stats = load_stats(self.storage, self.data, datetime.date.fromisoformat(self.today))
+        self.update_stats()
+
+    def update_stats(self, days=()):
+        """days：变化的日期 -> 当日数据（已删除为 None）"""
+        if self.stats is None:
+            return
+        for date, day in dict(days).items():
+            self.stats.set_day(date, day)
+        self.stats_text.set(format_summary(self.stats.summary(self.today)))
+
+    def get_available_years(self):
+        return self.storage.available_years(self.data)  # 最新年份优先
+    
+    # ========== 📌 外部修改检测 ==========
+
+    # 后台写入线程中调用：记下自己写盘后的文件状态，之后同样状态的变化事件不必重新读取
+    def record_own_write(self):
+        self.own_signature = self.watcher.stat_all()
+
+    # 监视线程中调用：放进队列，由 Tk 主线程执行
+    def on_external_change(self):
+        self.events.put(self.schedule_reload)
+
+    def schedule_reload(self):
+        if self.reload_job is None:
+            self.reload_job = self.root.after(RELOAD_DELAY_MS, self.reload_external)
+
+    def reload_external(self):
+        """读取磁盘上的数据，与内存比较，只应用变化的任务和日期"""
+        self.reload_job = None
+        if not self.writer.idle():  # 自己的修改还没写完，磁盘上的数据不完整 → 稍后再看
+            self.schedule_reload()
+            return
+        if self.watcher.stat_all() == self.own_signature:  # 是自己写盘引起的变化
+            return
+        try:
+            disk = self.storage.read_state()
+        except (OSError, ValueError):  # 文件正被编辑 / 写了一半，等下一次变化
+            return
+
+        # 两边同时添加过任务 → 位号表可能分叉，把磁盘上的位图换算到本窗口的位号
+        index, disk_index = self.data["task_index"], disk.get("task_index", disk["tasks"])
+        if any(a != b for a, b in zip(index, disk_index)):
+            index.extend(task for task in disk_index if task not in index)
+            bits = task_bits(self.data)
+            disk["history"] = {date: translate_day(day, disk_index, bits) for date, day in disk["history"].items()}
+        elif len(disk_index) > len(index):
+            index.extend(disk_index[len(index) :])
+
+        added, removed, reordered, days = diff_state(self.data, disk)
+        self.apply_external_tasks(disk["tasks"], added, removed, reordered)
+        self.apply_external_days(days)
+        self.own_signature = self.watcher.stat_all()
+
+    def apply_external_tasks(self, tasks, added, removed, reordered):
+        if not (added or removed or reordered):
+            return
+        for task in removed:
+            apply_record(self.data, {"op": "delete_task", "task": task})
+            self.saved_checked.discard(task)
+        for task in added:
+            apply_record(self.data, {"op": "add_task", "task": task})
+        self.data["tasks"][:] = tasks
+        self.load_tasks()
+        self.adjust_height()
+
+    def apply_external_days(self, days):
+        history = self.data["history"]
+        for date, day in days.items():
+            if day is None:
+                history.pop(date, None)
+            else:
+                history[date] = day
+            self.update_date_cell(date)
+        self.update_stats(days)
+
+        if self.today in days:
+            checked = set(checked_tasks(self.data, self.today))
+            current = self.checklist.get_checked()
+            if current != self.saved_checked and current != checked:
+                self.conflict_label.pack(anchor="w", after=self.date_label)  # 本窗口有未保存的勾选 → 保留并提示
+            else:
+                self.checklist.set_checked(checked)
+                self.conflict_label.pack_forget()
+            self.saved_checked = checked
+
+    # ========== 📌 跨天 ==========
+
+    def schedule_date_check(self):
+        """定时到下一个本地午夜；间隔不超过 CLOCK_CHECK_MS，休眠或调整时钟后能重新对准"""
+        if self.date_job is not None:
+            self.root.after_cancel(self.date_job)
+        self.date_job = self.root.after(min(ms_until_midnight(), CLOCK_CHECK_MS), self.check_date)
+
+    def check_date(self):
+        self.date_job = None
+        if datetime.date.today().isoformat() != self.today:
+            self.rollover()
+        self.schedule_date_check()
+
+    def on_focus_in(self, event):
+        if datetime.date.today().isoformat() != self.today:
+            self.check_date()
+
+    def rollover(self):
+        """跨天：原地清空勾选，热力图只推进一格，只追加一条当日记录
+
+        今天已经有记录（其他窗口已保存过、或时钟被调回后再调回）时保持原样，只恢复它的勾选
+        """
+        previous = datetime.date.fromisoformat(self.today)
+        self.today = datetime.date.today().isoformat()
+        self.date_label.config(text=f"📅 今日日期: {self.today}")
+        if self.today in self.data["history"]:
+            day = self.data["history"][self.today]
+        else:
+            day = {}  # 初始化今日数据为空
+            self.writer.save_change(self.data, {"op": "rollover", "date": self.today, "day": day})
+        self.grid_cache.update(self.today, day)
+        self.update_stats({self.today: day})
+
+        checked = set(checked_tasks(self.data, self.today))
+        self.checklist.set_checked(checked)
+        self.saved_checked = checked
+        self.conflict_label.pack_forget()
+
+        # ✅ 跨年：正在看“今年”的视图跟着到新的一年
+        today = datetime.date.fromisoformat(self.today)
+        if today.year != previous.year:
+            self.update_year_menu()
+            if self.current_year == previous.year:
+                self.current_year = today.year
+                self.year_var.set(str(today.year))
+        self.advance_view(previous)
+        print(f"🕒 日期已更新为 {self.today}")
+
+    def advance_view(self, previous):
+        """今年视图（最近 53 周）推进到今天：周日新起一列时已画的格子整体左移一列，只画新增的格子"""
+        today = datetime.date.fromisoformat(self.today)
+        if self.current_year is not None and self.current_year != today.year:
+            return  # 往年视图不受影响
+        if self.drawn_layout is None:
+            return  # 还没开始画，首次绘制时自然用新日期
+
+        old = self.grid
+        if (
+            self.raster
+            or self.current_year is None
+            or self.drawn_layout is not old.layout
+            or self.draw_job is not None
+            or old.layout.end_ordinal != previous.toordinal()
+        ):
+            self.draw_contribution_map()  # 光栅模式、时间线、还没画完、跨了不止一天等情况：按新范围重画
+            return
+
+        start_date, end_date = view_range(self.current_year, today)
+        task_mask = tasks_mask(self.data, self.filter_tasks) if self.filter_tasks else None
+        self.grid = self.grid_cache.get(
+            start_date,
+            end_date,
+            lambda start, end: self.storage.history_range(self.data, start, end),
+            task_mask,
+        )
+        layout = self.grid.layout
+        shift = layout.start_ordinal - old.layout.start_ordinal  # 0，或整周移出时为 7
+        if shift:
+            for date in old.layout.dates[:shift]:
+                self.canvas.delete(f"cell_{date}")
+            self.canvas.move("all", -CELL_PITCH * (shift // ROWS), 0)
+        kept = old.size - shift
+        self.cell_items = self.cell_items[shift:] + [None] * (layout.size - kept)
+        self.canvas.delete("label")
+        self.draw_month_labels(layout)
+        self.canvas.config(scrollregion=layout.scrollregion)
+        self.drawn_layout = layout
+        self.hover_date = None
+        self.draw_cells(kept, layout.size)
+        self.canvas.xview_moveto(1)
+
+    # ========== 📌 性能追踪面板 ==========
+
+    def toggle_overlay(self):
+        """显示 / 隐藏调试面板（热力图右上角）"""
+        if self.overlay is not None:
+            if self.overlay_job is not None:
+                self.root.after_cancel(self.overlay_job)
+                self.overlay_job = None
+            self.overlay.destroy()
+            self.overlay = None
+            return
+        self.overlay = tk.Label(
+            self.canvas_container, font=("Consolas", 9), justify="left", anchor="nw", bg="#FFFFE0", relief="solid", bd=1
+        )
+        self.overlay.place(relx=1.0, rely=0.0, anchor="ne")
+        self.overlay_last = (time.perf_counter(), TRACER.counters.get("on_hover", 0))
+        self.refresh_overlay()
+
+    def refresh_overlay(self):
+        """每秒刷新：各区间耗时、悬停频率、画布部件数、环形缓冲区占用"""
+        now, hovers = time.perf_counter(), TRACER.counters.get("on_hover", 0)
+        last_time, last_hovers = self.overlay_last
+        self.overlay_last = (now, hovers)
+        canvas_items = len(self.canvas.find_all())
+        TRACER.gauge("canvas_items", canvas_items)
+
+        lines = ["区间            最近/平均/最大 ms"]
+        for name, (count, last, average, peak) in sorted(TRACER.span_stats().items()):
+            lines.append(f"{name:<22} {last * 1000:6.1f} {average * 1000:6.1f} {peak * 1000:6.1f} ×{count}")
+        lines.append(f"悬停 {(hovers - last_hovers) / max(now - last_time, 1e-9):.0f} 次/秒")
+        lines.append(f"画布部件 {canvas_items}（累计创建 {TRACER.counters.get('canvas_items_created', 0)}）")
+        lines.append(f"缓冲区 {min(TRACER.written, TRACER.size)}/{TRACER.size} · Ctrl+Shift+T 导出")
+        self.overlay.config(text="\n".join(lines))
+        self.overlay.lift()
+        self.overlay_job = self.root.after(OVERLAY_REFRESH_MS, self.refresh_overlay)
+
+    def dump_trace(self):
+        count = TRACER.dump(TRACE_FILE)
+        print(f"📈 已导出 {count} 条追踪记录: {TRACE_FILE}（可用 chrome://tracing 或 Perfetto 打开）")
+
+
+class ProfileWorkspace:
+    """多个配置（每人一份数据）共用一个窗口
+
+    每个配置第一次选中时创建自己的 TaskManager（各自的数据、写盘线程、文件监视、热力图缓存），
+    切换配置只是隐藏 / 显示各自的 Frame，其他配置不重新读取也不重画。
+    """
+
+    def __init__(self, root, profile=None, render=None):
+        self.root = root
+        self.render = render
+        self.managers = {}  # 配置名 -> (Frame, TaskManager)
+        self.current = None
+
+        # 📌 配置选择行（窗口最上方）
+        bar = tk.Frame(root)
+        bar.pack(fill="x", padx=10, pady=(10, 0))
+        tk.Label(bar, text="👤 配置:", font=("微软雅黑", 12, "bold")).pack(side="left")
+        self.profile_var = tk.StringVar()
+        self.profile_menu = tk.OptionMenu(bar, self.profile_var, "")
+        self.profile_menu.config(font=("微软雅黑", 12, "bold"))
+        self.profile_menu.pack(side="left", padx=5)
+        tk.Button(bar, text="➕ 新建配置", font=("微软雅黑", 10), command=self.add_profile).pack(side="left", padx=5)
+
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.update_profile_menu()
+        self.switch(profile or DEFAULT_PROFILE)
+
+    def update_profile_menu(self):
+        menu = self.profile_menu["menu"]
+        menu.delete(0, "end")
+        for name in list_profiles():
+            menu.add_command(label=name, command=lambda value=name: self.switch(value))
+
+    def switch(self, name):
+        """显示配置 name（首次选中时才读取数据、创建界面）"""
+        if name == self.current:
+            return
+        if self.current is not None:
+            self.managers[self.current][0].pack_forget()
+        if name not in self.managers:
+            frame = tk.Frame(self.root)
+            manager = TaskManager(self.root, storage=open_profile(name), render=self.render, master=frame)
+            self.managers[name] = (frame, manager)
+        frame, manager = self.managers[name]
+        frame.pack(fill="both", expand=True)
+        self.current = name
+        self.profile_var.set(name)
+        self.root.title(f"每日任务追踪 - {name}")
+        self.root.after(10, manager.adjust_height)
+
+    def add_profile(self):
+        name = simpledialog.askstring("新建配置", "配置名称:")
+        if not name:
+            return
+        try:
+            create_profile(name.strip())
+        except ValueError as e:
+            messagebox.showerror("新建配置", str(e))
+            return
+        self.update_profile_menu()
+        self.switch(name.strip())
+
+    def on_close(self):
+        for _, manager in self.managers.values():
+            manager.close()
+        if TRACER.enabled:
+            self.managers[self.current][1].dump_trace()
+        self.root.destroy()
+
+
+# 距离下一个本地午夜的毫秒数（多等 1 ms，保证醒来时日期已经变了）
+def ms_until_midnight(now=None):
+    now = now or datetime.datetime.now()
+    midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time.min)
+    return int((midnight - now).total_seconds() * 1000) + 1
+
+
+def generate_test_data(
+    start_year=2022, task_count=1, density=1.0, per_task=False, seed=None, storage=None
+):
+    """生成测试历史并保存（默认与以前相同：2022 年起每天一条记录，完成数 i % 5）
+
+    task_count: 任务数量；density: 有记录的天数比例（< 1 为稀疏历史）；
+    per_task: 是否同时写入每个任务当天的勾选位图；storage: 写入的存储引擎（默认当前存储）
+    """
+    rng = random.Random(seed)
+    if task_count == 1:
+        tasks = ["测试任务"]
+    else:
+        tasks = [f"测试任务{n + 1}" for n in range(task_count)]
+    data = {"tasks": tasks, "history": {}}
+    today = datetime.date.today()
+    current_year = today.year
+
+    for year in range(start_year, current_year + 1):
+        start_date = datetime.date(year, 1, 1)
+
+        if year == current_year:
+            days = (today - start_date).days + 1
+        else:
+            days = 365
+
+        for i in range(days):
+            if density < 1 and rng.random() >= density:
+                continue  # 稀疏历史：这一天没有记录
+            date = (start_date + datetime.timedelta(days=i)).isoformat()
+            if task_count == 1:
+                completed = i % 5  # 随机完成数量
+                total = 5  # 假设每天总共有 5 个任务
+            else:
+                completed = rng.randint(0, task_count)
+                total = task_count
+            day = {"completed": completed, "total": total}
+            if per_task:
+                mask = sum(1 << n for n in rng.sample(range(len(tasks)), min(completed, len(tasks))))
+                if mask:
+                    day["mask"] = encode_mask(mask)
+            data["history"][date] = day
+
+    (storage or get_storage()).save(data)
+    return data
+
+if __name__ == "__main__":
+    # generate_test_data()
+
+    # ✅ 无界面的批量导入 / 导出：python Daily_Task_GUI.py export history.csv ...
+    if len(sys.argv) > 1 and sys.argv[1] in ("export", "import"):
+        import task_io
+
+        task_io.main()
+        sys.exit()
+
+    if RENDER_MODE not in RENDER_MODES:
+        sys.exit(f"❌ DAILY_TASK_RENDER 只能是 {' / '.join(RENDER_MODES)}，当前为: {RENDER_MODE}")
+
+    root = tk.Tk()
+
+    # 🔹 先设置默认宽度 500px，高度随意（之后会自动调整）
+    root.geometry("400x100")
+
+    # 置顶
+    root.attributes("-topmost", True)
+
+    # ✅ 多人配置：DAILY_TASK_PROFILE 选择启动时显示的配置，窗口中可随时切换
+    app = ProfileWorkspace(root, os.environ.get("DAILY_TASK_PROFILE"))  # 运行 Tkinter 主程序（高度在切换配置后自动调整）
+
+    root.mainloop()
@@ -0,0 +1,209 @@
+"""本地 HTTP 接口压测
+
+启动一个 task_server 实例（或连接已在运行的实例），用多个并发 keep-alive 连接持续发送请求，
+统计吞吐量和延迟分位数：
+
+    python benchmarks/bench_server.py --clients 50 --duration 10
+    python benchmarks/bench_server.py --no-spawn --port 8765 --write-ratio 0.1
+
+默认在临时目录中用 generate_test_data 生成数据后启动服务，不会影响自己的 tasks.json。
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_tracker import BACKEND_SUFFIXES  # noqa: E402
+from Daily_Task_GUI import generate_test_data  # noqa: E402
+from task_storage import BACKENDS, open_storage  # noqa: E402
+
+CURRENT_YEAR = datetime.date.today().year
+
+
+# 读请求按比例混合；写请求只勾选 / 取消勾选今日任务
+def read_requests():
+    today = datetime.date.today()
+    month_ago = (today - datetime.timedelta(days=30)).isoformat()
+    return [
+        ("GET", "/tasks", None),
+        ("GET", "/today", None),
+        ("GET", "/years", None),
+        ("GET", f"/summary/{CURRENT_YEAR}", None),
+        ("GET", f"/history?start={month_ago}&end={today.isoformat()}", None),
+    ]
+
+
+def write_request(tasks, rng):
+    return "POST", "/today", {"task": rng.choice(tasks), "done": rng.random() < 0.5}
+
+
+async def send(reader, writer, method, path, body):
+    payload = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else b""
+    writer.write(
+        (
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n"
+        ).encode("utf-8")
+        + payload
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+# 一个客户端：一条 keep-alive 连接上连续发请求，直到 deadline
+async def client(host, port, tasks, deadline, write_ratio, seed, latencies, errors):
+    rng = random.Random(seed)
+    reads = read_requests()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            if tasks and rng.random() < write_ratio:
+                method, path, body = write_request(tasks, rng)
+            else:
+                method, path, body = rng.choice(reads)
+            start = time.perf_counter()
+            status = await send(reader, writer, method, path, body)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(samples, p):
+    index = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+    return samples[index]
+
+
+async def run_load(host, port, tasks, clients, duration, write_ratio):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(
+        *(client(host, port, tasks, deadline, write_ratio, n, latencies, errors) for n in range(clients))
+    )
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "clients": clients,
+        "duration": elapsed,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput": len(latencies) / elapsed,
+        "latency": {
+            "mean": statistics.fmean(latencies),
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1],
+        },
+    }
+
+
+# 等待服务端口可连接
+async def wait_ready(host, port, timeout=10):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def fetch_tasks(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"GET /tasks HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])["tasks"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 HTTP 接口压测（吞吐量、延迟分位数）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766, help="服务端口（自动启动时使用该端口）")
+    parser.add_argument("--no-spawn", action="store_true", help="不启动服务，压测已在运行的实例")
+    parser.add_argument("--storage", choices=BACKENDS, default="journal", help="自动启动时使用的存储方式")
+    parser.add_argument("--tasks", type=int, default=20, help="自动启动时生成的任务数")
+    parser.add_argument("--years", type=int, default=3, help="自动启动时生成的历史年数")
+    parser.add_argument("--clients", type=int, default=20, help="并发连接数")
+    parser.add_argument("--duration", type=float, default=5.0, help="压测时长（秒）")
+    parser.add_argument("--write-ratio", type=float, default=0.05, help="写请求比例")
+    parser.add_argument("--output", help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    server = None
+    with tempfile.TemporaryDirectory() as workdir:
+        if not args.no_spawn:
+            path = os.path.join(workdir, "bench-server" + BACKEND_SUFFIXES.get(args.storage, ".json"))
+            generate_test_data(
+                start_year=CURRENT_YEAR - args.years + 1,
+                task_count=args.tasks,
+                per_task=True,
+                seed=0,
+                storage=open_storage(args.storage, path),
+            )
+            server = subprocess.Popen(
+                [
+                    sys.executable,
+                    os.path.join(ROOT, "task_server.py"),
+                    "--host", args.host,
+                    "--port", str(args.port),
+                    "--storage", args.storage,
+                    "--path", path,
+                ],
+                stdout=subprocess.DEVNULL,
+            )
+        try:
+            asyncio.run(wait_ready(args.host, args.port))
+            tasks = asyncio.run(fetch_tasks(args.host, args.port))
+            result = asyncio.run(
+                run_load(args.host, args.port, tasks, args.clients, args.duration, args.write_ratio)
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    latency = result["latency"]
+    print(f"▶ {result['clients']} 个连接, {result['duration']:.1f} s, 写请求比例 {args.write_ratio:.0%}")
+    print(f"  请求数    {result['requests']}（错误 {result['errors']}）")
+    print(f"  吞吐量    {result['throughput']:.0f} req/s")
+    print(
+        "  延迟      "
+        + "  ".join(f"{key} {latency[key] * 1000:.2f} ms" for key in ("mean", "p50", "p90", "p99", "max"))
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=4)
+        print(f"📄 结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
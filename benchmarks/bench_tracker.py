@@ -0,0 +1,289 @@
+"""性能基准测试
+
+用 generate_test_data 生成不同规模的历史数据（年份、任务数、稀疏 / 密集），
+分别计时各存储引擎的 load / save / 删除任务 / 年份列表，以及热力图相关操作；
+结果写入 JSON 报告，方便不同版本之间对比：
+
+    python benchmarks/bench_tracker.py --output bench.json
+    python benchmarks/bench_tracker.py --workload dense-10y-100 --compare bench.json
+
+需要 Tk 的用例（draw_contribution_map、on_hover、界面删除任务）优先使用已有的 DISPLAY，
+其次尝试启动 Xvfb 虚拟显示，都不可用时跳过并在报告中注明原因。
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Daily_Task_GUI import generate_test_data  # noqa: E402
+from heatmap_render import build_grid, view_range  # noqa: E402
+from task_storage import BACKENDS, open_storage  # noqa: E402
+
+CURRENT_YEAR = datetime.date.today().year
+
+# 预设数据规模：years 年历史、task_count 个任务、density 为有记录天数比例
+WORKLOADS = {
+    "baseline": dict(start_year=2022, task_count=1),  # 原 generate_test_data
+    "dense-10y-100": dict(start_year=CURRENT_YEAR - 9, task_count=100, per_task=True),
+    "sparse-10y-1000": dict(start_year=CURRENT_YEAR - 9, task_count=1000, density=0.1, per_task=True),
+    "dense-12y-1000": dict(start_year=CURRENT_YEAR - 11, task_count=1000, per_task=True),
+}
+DEFAULT_WORKLOADS = ["baseline", "dense-10y-100", "sparse-10y-1000"]
+BACKEND_SUFFIXES = {"sqlite": ".db", "array": ".days", "sharded": ".d"}
+
+
+# 计时：每轮先执行 setup（不计时），再把它的返回值交给 func 计时
+def measure(func, repeat, setup=None):
+    samples = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        func(arg)
+        samples.append(time.perf_counter() - start)
+    return {
+        "repeat": repeat,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+    }
+
+
+# 存储相关用例（不需要显示器）
+def bench_storage(workload, data, backend, workdir, repeat):
+    path = os.path.join(workdir, f"{workload}-{backend}" + BACKEND_SUFFIXES.get(backend, ".json"))
+    storage = open_storage(backend, path)
+    results = {}
+
+    results["save_data"] = measure(lambda _: storage.save(data), repeat)
+    results["load_data"] = measure(lambda _: storage.load(), repeat)
+
+    loaded = storage.load()
+    results["get_available_years"] = measure(lambda _: storage.available_years(loaded), repeat)
+
+    start_date, end_date = view_range(CURRENT_YEAR)
+    results["build_grid"] = measure(
+        lambda _: build_grid(storage.history_range(loaded, start_date, end_date), start_date, end_date),
+        repeat,
+    )
+
+    def fresh_copy(_=None):
+        storage.save(data)
+        return storage.load()
+
+    task = data["tasks"][len(data["tasks"]) // 2]
+    results["delete_task"] = measure(
+        lambda fresh: storage.save_change(fresh, {"op": "delete_task", "task": task}),
+        repeat,
+        setup=fresh_copy,
+    )
+    storage.close()
+    return results
+
+
+# 准备显示器：已有 DISPLAY 直接用，否则尝试启动 Xvfb；返回 (Xvfb 进程, 不可用原因)
+def ensure_display():
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        return None, None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        return None, "no DISPLAY and Xvfb not installed"
+    display = ":97"
+    process = subprocess.Popen(
+        [xvfb, display, "-screen", "0", "1280x1024x24"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    time.sleep(0.5)
+    if process.poll() is not None:
+        return None, "Xvfb failed to start"
+    os.environ["DISPLAY"] = display
+    return process, None
+
+
+# Tk 相关用例：启动、整图重绘、切换年份、鼠标悬停、界面删除任务
+def bench_tk(workload, data, workdir, repeat, render=None):
+    import tkinter as tk
+
+    import Daily_Task_GUI
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return None, f"Tk unavailable: {e}"
+    root.withdraw()
+
+    storage = open_storage("journal", os.path.join(workdir, f"{workload}.tk.json"))
+    storage.save(data)
+    results = {}
+
+    def startup(_):
+        app = Daily_Task_GUI.TaskManager(root, storage=storage, render=render)
+        app.draw_contribution_map()  # 启动时热力图在空闲回调中绘制，这里计入完整首屏
+        app.finish_drawing()
+        app.writer.close()
+        app.watcher.close()
+        root.after_cancel(app.event_job)
+        for child in root.winfo_children():
+            child.destroy()
+        return app
+
+    results["startup"] = measure(startup, repeat)
+
+    app = Daily_Task_GUI.TaskManager(root, storage=storage, render=render)
+    app.draw_contribution_map()
+    app.finish_drawing()
+
+    def cold_redraw(_):
+        app.grid_cache.clear()
+        app.draw_contribution_map()
+        app.finish_drawing()
+
+    results["draw_contribution_map"] = measure(cold_redraw, repeat)
+    results["draw_contribution_map_cached"] = measure(lambda _: app.draw_contribution_map(), repeat)
+    def change_year(_):
+        for year in (CURRENT_YEAR - 1, CURRENT_YEAR):
+            app.change_year(str(year))
+            app.finish_drawing()
+
+    results["change_year"] = measure(change_year, repeat)
+
+    class Event:
+        pass
+
+    events = []
+    for x in range(0, int(app.grid.layout.width), 3):
+        for y in range(10, 160, 5):
+            event = Event()
+            event.x, event.y = x, y
+            events.append(event)
+
+    def hover(_):
+        for event in events:
+            app.on_hover(event)
+
+    stats = measure(hover, repeat)
+    results["on_hover"] = {key: value / len(events) if key != "repeat" else value for key, value in stats.items()}
+
+    Daily_Task_GUI.messagebox.askyesno = lambda *args, **kwargs: True  # 跳过确认对话框
+
+    def pick_task(_=None):
+        if not app.data["tasks"]:
+            app.storage.save_change(app.data, {"op": "add_task", "task": "基准任务"})
+        app.task_var.set(app.data["tasks"][-1])
+
+    results["ui_delete_task"] = measure(lambda _: app.delete_task(), repeat, setup=pick_task)
+    root.destroy()
+    return results, None
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# 与旧报告对比：按 (数据规模, 引擎, 用例) 打印中位数及变化倍数
+def compare(report, previous_path):
+    with open(previous_path, "r") as f:
+        previous = json.load(f)
+    old = {(r["workload"], r["backend"], r["case"]): r["median"] for r in previous["results"]}
+    print(f"\n对比 {previous_path}（{previous['meta'].get('revision')} → {report['meta'].get('revision')}）")
+    for r in report["results"]:
+        key = (r["workload"], r["backend"], r["case"])
+        if key in old and old[key] > 0:
+            print(f"{'/'.join(key):<50} {old[key] * 1000:10.3f} ms → {r['median'] * 1000:10.3f} ms  ×{r['median'] / old[key]:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="每日任务追踪器性能基准测试")
+    parser.add_argument("--workload", action="append", choices=WORKLOADS, help="数据规模（可重复，默认三种）")
+    parser.add_argument("--years", type=int, help="自定义数据规模：历史年数")
+    parser.add_argument("--tasks", type=int, default=100, help="自定义数据规模：任务数")
+    parser.add_argument("--density", type=float, default=1.0, help="自定义数据规模：有记录天数比例")
+    parser.add_argument("--backend", action="append", choices=BACKENDS, help="存储引擎（可重复，默认全部）")
+    parser.add_argument("--repeat", type=int, default=5, help="每个用例重复次数")
+    parser.add_argument("--no-tk", action="store_true", help="跳过需要 Tk 的用例")
+    parser.add_argument("--render", choices=("vector", "raster"), default="vector", help="界面用例的热力图画法")
+    parser.add_argument("--output", default="bench_output.json", help="JSON 报告路径")
+    parser.add_argument("--compare", help="与之前的 JSON 报告对比")
+    args = parser.parse_args()
+
+    workloads = {name: WORKLOADS[name] for name in (args.workload or DEFAULT_WORKLOADS)}
+    if args.years:
+        workloads["custom"] = dict(
+            start_year=CURRENT_YEAR - args.years + 1,
+            task_count=args.tasks,
+            density=args.density,
+            per_task=True,
+        )
+    backends = args.backend or list(BACKENDS)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": [],
+        "skipped": [],
+    }
+
+    xvfb, display_error = (None, "--no-tk") if args.no_tk else ensure_display()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, params in workloads.items():
+                scratch = open_storage("json", os.path.join(workdir, f"{name}.seed.json"))
+                data = generate_test_data(seed=0, storage=scratch, **params)
+                days = len(data["history"])
+                print(f"▶ {name}: {len(data['tasks'])} 个任务, {days} 天")
+
+                for backend in backends:
+                    for case, stats in bench_storage(name, data, backend, workdir, args.repeat).items():
+                        report["results"].append({"workload": name, "backend": backend, "case": case, **stats})
+                        print(f"  {backend:<8} {case:<28} {stats['median'] * 1000:10.3f} ms")
+
+                tk_results, reason = (None, display_error) if display_error else bench_tk(
+                    name, data, workdir, args.repeat, args.render
+                )
+                if tk_results is None:
+                    report["skipped"].append({"workload": name, "cases": "tk", "reason": reason})
+                    print(f"  tk       跳过: {reason}")
+                    continue
+                tk_backend = "tk" if args.render == "vector" else f"tk-{args.render}"
+                for case, stats in tk_results.items():
+                    report["results"].append({"workload": name, "backend": tk_backend, "case": case, **stats})
+                    print(f"  {tk_backend:<8} {case:<28} {stats['median'] * 1000:10.3f} ms")
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"\n📄 报告已写入 {args.output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
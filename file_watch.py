@@ -0,0 +1,129 @@
+"""数据文件变化监视
+
+FileWatcher 在后台线程中监视若干文件，发现变化时调用 callback（在监视线程中调用，
+界面中不能直接调用 Tk，需放进队列由主线程执行）：
+- Linux 上使用 inotify（通过 ctypes 调用 libc），监视文件所在目录，能捕获原子 rename 替换
+- 其他平台或 inotify 不可用时，退回定时 stat 轮询（比较修改时间、大小、inode）
+
+diff_state 比较内存中的数据和磁盘上读到的数据，得到需要应用的任务 / 日期变化。
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+POLL_INTERVAL = 1.0  # stat 轮询间隔（秒）
+
+# inotify 事件：写完关闭、rename 进入、新建、删除
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def load_inotify():
+    """返回 libc（支持 inotify 时），否则 None"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1  # 旧版 libc 没有该函数
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """监视 paths 中的文件，任一文件被修改、替换或删除时调用 callback()"""
+
+    def __init__(self, paths, callback, poll_interval=POLL_INTERVAL):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.stopped = threading.Event()
+        self.thread = None
+        self.mode = None  # "inotify" / "poll"，没有要监视的文件时为 None
+        if not self.paths:
+            return
+
+        libc = load_inotify()
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC) if libc else -1
+        if self.fd >= 0:
+            self.names = {os.path.basename(path) for path in self.paths}
+            for directory in {os.path.dirname(path) for path in self.paths}:
+                libc.inotify_add_watch(
+                    self.fd, directory.encode(), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+                )
+            self.mode, target = "inotify", self.watch_inotify
+        else:
+            self.mode, target = "poll", self.watch_poll
+        self.thread = threading.Thread(target=target, daemon=True)
+        self.thread.start()
+
+    def watch_inotify(self):
+        try:
+            while not self.stopped.is_set():
+                ready, _, _ = select.select([self.fd], [], [], self.poll_interval)
+                if not ready:
+                    continue
+                try:
+                    buffer = os.read(self.fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                changed = False
+                offset = 0
+                while offset < len(buffer):
+                    _, _, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+                    name = buffer[offset + EVENT_HEADER.size : offset + EVENT_HEADER.size + length]
+                    changed |= name.rstrip(b"\0").decode(errors="replace") in self.names
+                    offset += EVENT_HEADER.size + length
+                if changed and not self.stopped.is_set():  # close() 之后不再回调
+                    self.callback()
+        finally:
+            os.close(self.fd)
+
+    def stat_all(self):
+        signature = []
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size, st.st_ino))
+            except FileNotFoundError:
+                signature.append(None)
+        return signature
+
+    def watch_poll(self):
+        last = self.stat_all()
+        while not self.stopped.wait(self.poll_interval):
+            current = self.stat_all()
+            if current != last and not self.stopped.is_set():
+                last = current
+                self.callback()
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+
+def diff_state(current, disk):
+    """比较内存数据 current 与磁盘数据 disk
+
+    返回 (新增任务, 删除的任务, 任务顺序是否不同, {变化的日期: 磁盘上的当日数据（已删除为 None）})
+    """
+    tasks, disk_tasks = current["tasks"], disk["tasks"]
+    added = [task for task in disk_tasks if task not in tasks]
+    removed = [task for task in tasks if task not in disk_tasks]
+    reordered = [task for task in tasks if task in disk_tasks] != [task for task in disk_tasks if task in tasks]
+
+    history, disk_history = current["history"], disk["history"]
+    days = {date: day for date, day in disk_history.items() if history.get(date) != day}
+    days.update((date, None) for date in history if date not in disk_history)
+    return added, removed, reordered, days
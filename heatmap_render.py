@@ -0,0 +1,482 @@
+"""热力图渲染
+
+与 Tk 无关的热力图计算与导出：
+- build_grid: 把历史数据转成数组形式的格子（完成率、颜色分档、行列位置），
+  安装了 NumPy 时按整段日期做向量化计算，否则退回纯 Python；
+  指定任务位图时只统计这些任务（按位与 + 数 1 的个数）
+- write_png / write_svg: 把格子连同月份、星期标签导出为图片，可在无显示器的服务器上批量运行
+
+Tk 界面（TaskManager.draw_contribution_map）也使用同一份格子数据和布局常量；
+光栅模式下直接用 rasterize + photo_rows 把整张图写进一张 PhotoImage。
+"""
+
+import argparse
+import datetime
+import functools
+import struct
+import zlib
+from collections import OrderedDict
+
+from task_storage import day_mask
+
+try:
+    import numpy as np
+except ImportError:  # 没有 NumPy 时使用纯 Python 实现
+    np = None
+
+# 热力图颜色（按完成率分档）
+HEATMAP_COLORS = [
+    "#ebedf0",  # 0%  (无任务)
+    "#c6e48b",  # 10%
+    "#7bc96f",  # 25%
+    "#40c463",  # 50%
+    "#30a14e",  # 75%
+    "#216e39",  # 100%
+]
+BORDER_COLOR = "#D3D3D3"
+BACKGROUND_COLOR = "#ffffff"
+TEXT_COLOR = "#000000"
+
+# 布局（与原 Tk 界面一致）
+CELL_SIZE = 15
+CELL_RADIUS = 3  # 圆角半径
+CELL_SPACING = 4
+CELL_PITCH = CELL_SIZE + CELL_SPACING
+BORDER_WIDTH = 2
+GRID_LEFT = 10 + 1.8 * CELL_PITCH  # 右移 2 个 cell，给星期标签留位置
+GRID_TOP = 20
+MAP_HEIGHT = 150
+ROWS = 7  # 周日 ~ 周六
+MONTH_LABEL_Y = 10
+WEEKDAY_LABELS = [  # (文字, x, y)，只显示 Mon / Wed / Fri，左侧对齐
+    ("Mon", 8, 45),
+    ("Wed", 8, 45 + CELL_PITCH * 2),
+    ("Fri", 8, 45 + CELL_PITCH * 4),
+]
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+# 根据完成数 / 总数计算格子颜色
+def get_cell_color(completed, total):
+    return HEATMAP_COLORS[color_bucket(completed, total)]
+
+
+# 完成率分档（0 ~ len(HEATMAP_COLORS) - 1）
+def color_bucket(completed, total):
+    if completed == 0 or total == 0:
+        completion_ratio = 0
+    else:
+        completion_ratio = completed / total
+    return min(int(completion_ratio * (len(HEATMAP_COLORS) - 1)), len(HEATMAP_COLORS) - 1)
+
+
+# 热力图显示的日期范围：今年显示截至今天的最近 53 周，往年显示 01-01 ~ 12-31
+def view_range(year, today=None):
+    today = today or datetime.date.today()
+    if year == today.year:
+        # 最后一列从周日开始，到今天为止
+        start_date = today - datetime.timedelta(days=7 * 52 + (today.weekday() + 1) % 7)
+        return start_date, today
+    return datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+
+
+class CalendarLayout:
+    """一段日期范围的日历布局，按周日开始的周排成 7 行 × N 列
+
+    只由日历决定（与数据无关）：每格的行列和像素坐标、月份标签位置、滚动区域，
+    按日期序数缓存后由绘制、导出和悬停定位共用
+    """
+
+    def __init__(self, start_ordinal, end_ordinal):
+        self.start_ordinal = start_ordinal
+        self.end_ordinal = end_ordinal
+        self.size = end_ordinal - start_ordinal + 1
+        self.offset = start_ordinal % 7  # 第一天在第一列的第几行（序数 % 7：0 = 周日）
+        self.columns = (self.size + self.offset + ROWS - 1) // ROWS
+        self.dates = [datetime.date.fromordinal(o).isoformat() for o in range(start_ordinal, end_ordinal + 1)]
+
+        if np is not None:
+            self.cols, self.rows = np.divmod(np.arange(self.size) + self.offset, ROWS)
+        else:
+            self.cols = [(i + self.offset) // ROWS for i in range(self.size)]
+            self.rows = [(i + self.offset) % ROWS for i in range(self.size)]
+
+        # 每格左上 / 右下角坐标
+        cols = self.cols.tolist() if np is not None else self.cols
+        rows = self.rows.tolist() if np is not None else self.rows
+        self.boxes = []
+        for col, row in zip(cols, rows):
+            x1 = GRID_LEFT + col * CELL_PITCH
+            y1 = GRID_TOP + row * CELL_PITCH
+            self.boxes.append((x1, y1, x1 + CELL_SIZE, y1 + CELL_SIZE))
+
+        self.month_labels = self._month_labels()
+        self.width = GRID_LEFT + self.columns * CELL_PITCH
+        self.scrollregion = (0, 0, self.width, MAP_HEIGHT)
+
+    def _month_labels(self):
+        """月份标签 [(x, 月份名)]：每个月 1 日所在列，首月稍微右移，其余月份右移 1.6 格"""
+        labels = []
+        first = datetime.date.fromordinal(self.start_ordinal)
+        year, month = first.year, first.month
+        ordinal = self.start_ordinal
+        while ordinal <= self.end_ordinal:
+            col = (ordinal - self.start_ordinal + self.offset) // ROWS
+            shift = 0.6 if not labels else 1.6
+            labels.append((GRID_LEFT + int(shift * CELL_PITCH) + col * CELL_PITCH, MONTH_NAMES[month - 1]))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            ordinal = datetime.date(year, month, 1).toordinal()
+        return labels
+
+    def index_of(self, date):
+        """ISO 日期 → 格子下标，不在范围内返回 None"""
+        i = datetime.date.fromisoformat(date).toordinal() - self.start_ordinal
+        return i if 0 <= i < self.size else None
+
+    def index_at(self, x, y):
+        """画布坐标 → 格子下标：直接按网格公式计算，不在格子内返回 None"""
+        # 半像素容差：抵消 GRID_LEFT 小数带来的浮点误差，保证格子边缘也能命中
+        col, dx = divmod(x - GRID_LEFT + 0.5, CELL_PITCH)
+        row, dy = divmod(y - GRID_TOP + 0.5, CELL_PITCH)
+        if dx > CELL_SIZE + 1 or dy > CELL_SIZE + 1 or not 0 <= row < ROWS:  # 落在格子间隙里
+            return None
+        i = int(col) * ROWS + int(row) - self.offset
+        return i if 0 <= i < self.size else None
+
+
+# 按日期序数缓存布局：同一视图只做一次日历计算
+@functools.lru_cache(maxsize=32)
+def get_layout(start_ordinal, end_ordinal):
+    return CalendarLayout(start_ordinal, end_ordinal)
+
+
+# 某天参与着色的 (完成数, 总数)：不筛选时取当天汇总，筛选时按任务位图计算
+def day_counts(day, task_mask=None):
+    if not day:
+        return 0, 0
+    if task_mask is None:
+        return day.get("completed", 0), day.get("total", 0)
+    return (day_mask(day) & task_mask).bit_count(), task_mask.bit_count()
+
+
+class HeatmapGrid:
+    """一段日期范围的热力图格子：布局（共享缓存）+ 每天的完成数 / 总数 / 颜色分档数组"""
+
+    def __init__(self, start_date, end_date, completed, total, task_mask=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.task_mask = task_mask  # 只统计这些任务（None 为全部）
+        self.layout = get_layout(start_date.toordinal(), end_date.toordinal())
+        self.size = self.layout.size
+
+        if np is not None:
+            self.completed = np.asarray(completed, dtype=np.int32)
+            self.total = np.asarray(total, dtype=np.int32)
+        else:
+            self.completed = list(completed)
+            self.total = list(total)
+        self.buckets = color_buckets(self.completed, self.total)
+
+    def date(self, i):
+        return self.layout.dates[i]
+
+    def index_of(self, date):
+        return self.layout.index_of(date)
+
+    def color(self, i):
+        return HEATMAP_COLORS[int(self.buckets[i])]
+
+    def cell(self, i):
+        """第 i 个格子：(日期, 完成数, 总数, 颜色)"""
+        return self.layout.dates[i], int(self.completed[i]), int(self.total[i]), self.color(i)
+
+    def set_day(self, i, completed, total):
+        self.completed[i] = completed
+        self.total[i] = total
+        self.buckets[i] = color_bucket(completed, total)
+
+
+# 向量化的颜色分档：数组进、数组出
+def color_buckets(completed, total):
+    top = len(HEATMAP_COLORS) - 1
+    if np is None:
+        return [color_bucket(c, t) for c, t in zip(completed, total)]
+    ratio = np.zeros(len(completed), dtype=np.float64)
+    np.divide(completed, total, out=ratio, where=(completed != 0) & (total != 0))
+    return np.minimum((ratio * top).astype(np.int8), top)
+
+
+# 从历史数据（日期 -> 当日数据）生成一段日期范围的格子，task_mask 为只统计的任务位图
+def build_grid(history, start_date, end_date, task_mask=None):
+    if task_mask is None and hasattr(history, "counts"):  # 数组形式的历史：直接切片，不逐天生成字典
+        completed, total = history.counts(start_date, end_date)
+        return HeatmapGrid(start_date, end_date, completed, total)
+    size = end_date.toordinal() - start_date.toordinal() + 1
+    completed = [0] * size
+    total = [0] * size
+    day = start_date
+    for i in range(size):
+        completed[i], total[i] = day_counts(history.get(day.isoformat()), task_mask)
+        day += datetime.timedelta(days=1)
+    return HeatmapGrid(start_date, end_date, completed, total, task_mask)
+
+
+class HeatmapGridCache:
+    """按日期范围缓存热力图格子，最近最少使用的视图先淘汰"""
+
+    def __init__(self, max_views=8):
+        self.max_views = max_views
+        self.views = OrderedDict()  # (开始日期, 结束日期, 任务位图) -> HeatmapGrid
+
+    def get(self, start_date, end_date, load_history, task_mask=None):
+        """取一个视图的格子，首次访问时用 load_history(start, end) 计算并缓存"""
+        key = (start_date, end_date, task_mask)
+        if key in self.views:
+            self.views.move_to_end(key)
+            return self.views[key]
+
+        grid = build_grid(load_history(start_date, end_date), start_date, end_date, task_mask)
+        self.views[key] = grid
+        if len(self.views) > self.max_views:
+            self.views.popitem(last=False)
+        return grid
+
+    def update(self, date, data):
+        """某天数据变化：只重算各缓存视图中这一天的格子"""
+        for grid in self.views.values():
+            i = grid.index_of(date)
+            if i is not None:
+                grid.set_day(i, *day_counts(data, grid.task_mask))
+
+    def clear(self):
+        self.views.clear()
+
+
+# ========== 📌 位图导出 ==========
+
+# 5×8 点阵字体，只包含月份 / 星期标签用到的字母
+FONT = {
+    "J": ["..###", "...#.", "...#.", "...#.", "#..#.", "#..#.", ".##..", "....."],
+    "F": ["#####", "#....", "#....", "####.", "#....", "#....", "#....", "....."],
+    "M": ["#...#", "##.##", "#.#.#", "#.#.#", "#...#", "#...#", "#...#", "....."],
+    "A": [".###.", "#...#", "#...#", "#####", "#...#", "#...#", "#...#", "....."],
+    "S": [".####", "#....", "#....", ".###.", "....#", "....#", "####.", "....."],
+    "O": [".###.", "#...#", "#...#", "#...#", "#...#", "#...#", ".###.", "....."],
+    "N": ["#...#", "##..#", "#.#.#", "#..##", "#...#", "#...#", "#...#", "....."],
+    "D": ["####.", "#...#", "#...#", "#...#", "#...#", "#...#", "####.", "....."],
+    "W": ["#...#", "#...#", "#...#", "#.#.#", "#.#.#", "##.##", "#...#", "....."],
+    "a": [".....", ".....", ".###.", "....#", ".####", "#...#", ".####", "....."],
+    "b": ["#....", "#....", "####.", "#...#", "#...#", "#...#", "####.", "....."],
+    "c": [".....", ".....", ".###.", "#....", "#....", "#....", ".###.", "....."],
+    "d": ["....#", "....#", ".####", "#...#", "#...#", "#...#", ".####", "....."],
+    "e": [".....", ".....", ".###.", "#...#", "#####", "#....", ".###.", "....."],
+    "g": [".....", ".....", ".####", "#...#", "#...#", ".####", "....#", ".###."],
+    "i": ["..#..", ".....", ".##..", "..#..", "..#..", "..#..", ".###.", "....."],
+    "l": [".##..", "..#..", "..#..", "..#..", "..#..", "..#..", ".###.", "....."],
+    "n": [".....", ".....", "####.", "#...#", "#...#", "#...#", "#...#", "....."],
+    "o": [".....", ".....", ".###.", "#...#", "#...#", "#...#", ".###.", "....."],
+    "p": [".....", ".....", "####.", "#...#", "#...#", "####.", "#....", "#...."],
+    "r": [".....", ".....", "#.##.", "##...", "#....", "#....", "#....", "....."],
+    "t": ["..#..", "..#..", ".###.", "..#..", "..#..", "..#..", "...##", "....."],
+    "u": [".....", ".....", "#...#", "#...#", "#...#", "#..##", ".##.#", "....."],
+    "v": [".....", ".....", "#...#", "#...#", "#...#", ".#.#.", "..#..", "....."],
+    "y": [".....", ".....", "#...#", "#...#", "#...#", ".####", "....#", ".###."],
+}
+FONT_WIDTH, FONT_HEIGHT, FONT_ADVANCE = 5, 8, 6
+
+# 调色板下标：0 背景，1 边框，2 ~ 7 颜色分档，8 文字
+PALETTE = [BACKGROUND_COLOR, BORDER_COLOR] + HEATMAP_COLORS + [TEXT_COLOR]
+PALETTE_BORDER, PALETTE_CELLS, PALETTE_TEXT = 1, 2, len(PALETTE) - 1
+RASTER_LEFT = round(GRID_LEFT) - BORDER_WIDTH // 2  # 光栅图中第 0 列格子（含边框）的左上角
+RASTER_TOP = GRID_TOP - BORDER_WIDTH // 2
+
+
+# 单个格子的像素模板（含边框）：0 透明，1 边框，2 填充；四角按圆角半径裁掉
+def cell_template():
+    offset = BORDER_WIDTH // 2
+    size = CELL_SIZE + 2 * offset
+    template = []
+    for y in range(size):
+        row = []
+        for x in range(size):
+            if _in_rounded_rect(x - offset, y - offset, CELL_SIZE, CELL_RADIUS):
+                row.append(2)
+            elif _in_rounded_rect(x, y, size, CELL_RADIUS + offset):
+                row.append(1)
+            else:
+                row.append(0)
+        template.append(row)
+    return template
+
+
+def _in_rounded_rect(x, y, size, radius):
+    """像素 (x, y) 是否落在边长 size、圆角 radius 的圆角正方形内"""
+    if not (0 <= x < size and 0 <= y < size):
+        return False
+    cx = min(max(x + 0.5, radius), size - radius)
+    cy = min(max(y + 0.5, radius), size - radius)
+    return (x + 0.5 - cx) ** 2 + (y + 0.5 - cy) ** 2 <= radius**2
+
+
+def _text_pixels(text, x, y):
+    """文字左上角在 (x, y) 时点亮的像素坐标"""
+    for n, char in enumerate(text):
+        glyph = FONT.get(char)
+        if glyph is None:
+            continue
+        for gy, line in enumerate(glyph):
+            for gx, bit in enumerate(line):
+                if bit == "#":
+                    yield x + n * FONT_ADVANCE + gx, y + gy
+
+
+def _text_width(text):
+    return len(text) * FONT_ADVANCE - 1
+
+
+# 把格子光栅化为调色板下标图像，返回 (宽, 高, 每行 bytes 列表)
+def rasterize(grid, labels=True):
+    layout = grid.layout
+    width = int(layout.width) + CELL_PITCH
+    height = MAP_HEIGHT
+    left, top = RASTER_LEFT, RASTER_TOP
+    template = cell_template()
+    tsize = len(template)
+
+    if np is not None:
+        buckets = np.full((ROWS, layout.columns), -1, dtype=np.int16)
+        buckets[layout.rows, layout.cols] = grid.buckets
+        xs = np.arange(width) - left
+        ys = np.arange(height) - top
+        col, dx = np.divmod(xs, CELL_PITCH)
+        row, dy = np.divmod(ys, CELL_PITCH)
+        inside_x = (xs >= 0) & (col < layout.columns) & (dx < tsize)
+        inside_y = (ys >= 0) & (row < ROWS) & (dy < tsize)
+        cell = buckets[np.clip(row, 0, ROWS - 1)[:, None], np.clip(col, 0, layout.columns - 1)[None, :]]
+        mask = np.asarray(template, dtype=np.uint8)[np.clip(dy, 0, tsize - 1)[:, None], np.clip(dx, 0, tsize - 1)[None, :]]
+        mask[~(inside_y[:, None] & inside_x[None, :]) | (cell < 0)] = 0
+        image = np.where(mask == 2, cell + PALETTE_CELLS, mask).astype(np.uint8)
+    else:
+        cells = {}
+        for i in range(grid.size):
+            cells[(layout.rows[i], layout.cols[i])] = grid.buckets[i]
+        image = [bytearray(width) for _ in range(height)]
+        for (row, col), bucket in cells.items():
+            x0, y0 = left + col * CELL_PITCH, top + row * CELL_PITCH
+            for ty in range(tsize):
+                line = image[y0 + ty]
+                for tx, value in enumerate(template[ty]):
+                    if value:
+                        line[x0 + tx] = bucket + PALETTE_CELLS if value == 2 else PALETTE_BORDER
+
+    if labels:
+        texts = [(x - _text_width(name) / 2, MONTH_LABEL_Y, name) for x, name in layout.month_labels]
+        texts += [(x, y, name) for name, x, y in WEEKDAY_LABELS]
+        for x, y, name in texts:
+            for px, py in _text_pixels(name, int(x), int(y) - FONT_HEIGHT // 2):
+                if 0 <= px < width and 0 <= py < height:
+                    image[py][px] = PALETTE_TEXT
+
+    rows = [line.tobytes() if np is not None else bytes(line) for line in image]
+    return width, height, rows
+
+
+# 单个格子（含边框）的调色板下标行，光栅模式下单格改色用；左上角见 cell_origin
+@functools.lru_cache(maxsize=None)
+def cell_rows(bucket):
+    return tuple(bytes(bucket + PALETTE_CELLS if value == 2 else value for value in row) for row in cell_template())
+
+
+def cell_origin(layout, i):
+    return RASTER_LEFT + int(layout.cols[i]) * CELL_PITCH, RASTER_TOP + int(layout.rows[i]) * CELL_PITCH
+
+
+# 调色板下标行 → Tk PhotoImage.put 的数据（"{#rrggbb ...} {...}"），一次调用写入所有行；相同的行只转换一次
+def photo_rows(rows):
+    converted = {}
+    lines = []
+    for row in rows:
+        line = converted.get(row)
+        if line is None:
+            line = converted[row] = "{" + " ".join([PALETTE[value] for value in row]) + "}"
+        lines.append(line)
+    return " ".join(lines)
+
+
+def _hex_to_rgb(color):
+    return bytes(int(color[i : i + 2], 16) for i in (1, 3, 5))
+
+
+# 导出 PNG（调色板格式，只用标准库 zlib 编码）
+def write_png(grid, path):
+    width, height, rows = rasterize(grid)
+
+    def chunk(kind, payload):
+        return struct.pack(">I", len(payload)) + kind + payload + struct.pack(">I", zlib.crc32(kind + payload))
+
+    raw = b"".join(b"\x00" + row for row in rows)  # 每行前加 0 号滤波器
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)))
+        f.write(chunk(b"PLTE", b"".join(_hex_to_rgb(color) for color in PALETTE)))
+        f.write(chunk(b"IDAT", zlib.compress(raw, 9)))
+        f.write(chunk(b"IEND", b""))
+
+
+# 导出 SVG（矢量圆角矩形 + 文字）
+def write_svg(grid, path):
+    layout = grid.layout
+    width = int(layout.width) + CELL_PITCH
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{MAP_HEIGHT}" '
+        f'viewBox="0 0 {width} {MAP_HEIGHT}" font-family="Microsoft YaHei, sans-serif" font-size="10">',
+        f'<rect width="100%" height="100%" fill="{BACKGROUND_COLOR}"/>',
+    ]
+    for i in range(grid.size):
+        date, completed, total, color = grid.cell(i)
+        x, y = layout.boxes[i][:2]
+        parts.append(
+            f'<rect x="{x:g}" y="{y:g}" width="{CELL_SIZE}" height="{CELL_SIZE}" rx="{CELL_RADIUS}" '
+            f'fill="{color}" stroke="{BORDER_COLOR}" stroke-width="{BORDER_WIDTH}">'
+            f"<title>{date}: {completed}/{total}</title></rect>"
+        )
+    for x, name in layout.month_labels:
+        parts.append(f'<text x="{x:g}" y="{MONTH_LABEL_Y}" text-anchor="middle" dominant-baseline="middle">{name}</text>')
+    for name, x, y in WEEKDAY_LABELS:
+        parts.append(f'<text x="{x}" y="{y}" dominant-baseline="middle">{name}</text>')
+    parts.append("</svg>")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+
+
+# 按文件扩展名导出某一年的热力图
+def render_year(history, year, path, today=None):
+    start_date, end_date = view_range(year, today)
+    grid = build_grid(history, start_date, end_date)
+    if path.lower().endswith(".svg"):
+        write_svg(grid, path)
+    else:
+        write_png(grid, path)
+    return grid
+
+
+def main():
+    from task_storage import BACKENDS, open_storage
+
+    parser = argparse.ArgumentParser(description="无界面导出任务热力图（PNG / SVG）")
+    parser.add_argument("output", help="输出文件（.png 或 .svg）")
+    parser.add_argument("--year", type=int, default=datetime.date.today().year, help="年份（默认今年）")
+    parser.add_argument("--storage", choices=BACKENDS, help="存储方式（默认 DAILY_TASK_STORAGE）")
+    parser.add_argument("--path", help="数据文件路径")
+    args = parser.parse_args()
+
+    storage = open_storage(args.storage, args.path)
+    data = storage.load()
+    start_date, end_date = view_range(args.year)
+    render_year(storage.history_range(data, start_date, end_date), args.year, args.output)
+    storage.close()
+    print(f"✅ 已导出 {args.year} 年热力图: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""紧凑的数组形式历史数据
+
+每年一个定长文件（<年份>.days），按一年中的第几天存放 366 条 4 字节记录：
+完成数、总数各一个 uint16（本机字节序），总数为 0xFFFF 表示这一天没有记录。
+文件通过 mmap 打开，读取十年历史也不需要逐天解析或分配对象。
+
+当天的任务勾选位图（mask）存在同一年的 <年份>.masks 中：366 条定长记录（小端无符号整数），
+记录宽度按 MASK_WORD 字节随任务数增长（只在任务数跨过 64 的倍数时整体加宽一次），
+保存进度时同样原地写入。该年还没有勾选过任务时不创建这个文件。
+
+ArrayHistory 提供与原来 data["history"] 相同的字典接口（日期 -> 当日数据），
+现有调用方（热力图、年份列表等）无需修改；其余很少出现的附加字段只在非 0 时保存在 extras 中。
+"""
+
+import datetime
+import mmap
+import os
+from collections.abc import Mapping, MutableMapping
+
+DAYS_PER_YEAR = 366
+ABSENT = 0xFFFF  # 总数为该值表示当天没有记录
+EMPTY_YEAR = b"\x00\x00\xff\xff" * DAYS_PER_YEAR  # 0 与 0xFFFF 在任何字节序下都相同
+MASK_WORD = 8  # 位图记录宽度的增长单位（字节），即每 64 个任务
+
+
+def day_of_year(day):
+    return day.toordinal() - datetime.date(day.year, 1, 1).toordinal()
+
+
+class YearArray:
+    """一年的定长记录文件，mmap 后按 uint16 读写"""
+
+    def __init__(self, path, create=False, readonly=False):
+        if not os.path.exists(path):
+            if not create:
+                raise FileNotFoundError(path)
+            with open(path, "wb") as f:
+                f.write(EMPTY_YEAR)
+        self.file = open(path, "rb" if readonly else "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE)
+        self.values = memoryview(self.map).cast("H")  # [完成数, 总数, 完成数, 总数, ...]
+
+    def get(self, index):
+        """第 index 天的 (完成数, 总数)，没有记录返回 None"""
+        completed, total = self.values[2 * index], self.values[2 * index + 1]
+        return None if total == ABSENT else (completed, total)
+
+    def set(self, index, completed, total):
+        self.values[2 * index] = completed
+        self.values[2 * index + 1] = total
+
+    def present(self):
+        """有记录的天（下标）"""
+        totals = self.values[1::2]
+        return [index for index in range(DAYS_PER_YEAR) if totals[index] != ABSENT]
+
+    def flush(self):
+        self.map.flush()
+
+    def close(self):
+        self.values.release()
+        self.map.close()
+        self.file.close()
+
+
+def mask_width(mask):
+    return max(1, -(-mask.bit_length() // (8 * MASK_WORD))) * MASK_WORD
+
+
+class MaskArray:
+    """一年的任务位图文件，mmap 后按定长记录读写"""
+
+    def __init__(self, path, width=None, readonly=False):
+        if not os.path.exists(path):
+            if width is None:
+                raise FileNotFoundError(path)
+            with open(path, "wb") as f:
+                f.write(bytes(width * DAYS_PER_YEAR))
+        self.path = path
+        self.file = open(path, "rb" if readonly else "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE)
+        self.width = len(self.map) // DAYS_PER_YEAR
+
+    def get(self, index):
+        start = index * self.width
+        return int.from_bytes(self.map[start : start + self.width], "little")
+
+    def set(self, index, mask):
+        start = index * self.width
+        self.map[start : start + self.width] = mask.to_bytes(self.width, "little")
+
+    def fits(self, mask):
+        return mask.bit_length() <= self.width * 8
+
+    def widened(self, mask):
+        """复制成能放下 mask 的更宽的文件（临时文件 + rename），返回新的 MaskArray
+
+        旧的映射由调用方留到 close() 再关闭（后台线程可能正在 flush 它）
+        """
+        padding = bytes(mask_width(mask) - self.width)  # 小端：高位字节补在每条记录后面
+        records = b"".join(
+            self.map[index * self.width : (index + 1) * self.width] + padding for index in range(DAYS_PER_YEAR)
+        )
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(records)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        return MaskArray(self.path)
+
+    def flush(self):
+        self.map.flush()
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class ArrayHistory(MutableMapping):
+    """目录下按年存放的数组历史，对外表现为 {日期: 当日数据} 字典"""
+
+    def __init__(self, directory, extras=None, readonly=False):
+        self.directory = directory
+        self.readonly = readonly  # 只读打开（批量报告等）：不创建目录和文件，mmap 只读
+        self.extras = extras if extras is not None else {}  # 日期 -> 非 0 的附加字段
+        self.years = {}  # 年份 -> 已打开的 YearArray
+        self.masks = {}  # 年份 -> 已打开的 MaskArray（该年没有位图文件为 None）
+        self.retired = []  # 加宽后换下来的 MaskArray，close() 时关闭
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+
+    def year_array(self, year, create=False):
+        if year not in self.years:
+            path = os.path.join(self.directory, f"{year:04d}.days")
+            if not create and not os.path.exists(path):
+                return None
+            self.years[year] = YearArray(path, create=True, readonly=self.readonly)
+        return self.years[year]
+
+    def mask_array(self, year, mask=0):
+        """year 的位图文件；放不下 mask 时加宽；还没有文件且 mask 为 0 时返回 None"""
+        array = self.masks.get(year)
+        if array is None:
+            path = os.path.join(self.directory, f"{year:04d}.masks")
+            if os.path.exists(path):
+                array = MaskArray(path, readonly=self.readonly)
+            elif mask:
+                array = MaskArray(path, mask_width(mask))
+            self.masks[year] = array
+            if array is None:
+                return None
+        if not array.fits(mask):
+            self.retired.append(array)
+            array = self.masks[year] = array.widened(mask)
+        return array
+
+    def clear_mask_bits(self, cleared):
+        """去掉所有年份位图中 cleared 的位（清理已删除任务时使用）"""
+        for name in os.listdir(self.directory):
+            if name.endswith(".masks"):
+                array = self.mask_array(int(name[:-6]))
+                for index in range(DAYS_PER_YEAR):
+                    mask = array.get(index)
+                    if mask & cleared:
+                        array.set(index, mask & ~cleared)
+
+    def _locate(self, date):
+        day = datetime.date.fromisoformat(date)
+        return day.year, day_of_year(day)
+
+    def __getitem__(self, date):
+        year, index = self._locate(date)
+        array = self.year_array(year)
+        record = array.get(index) if array is not None else None
+        if record is None:
+            raise KeyError(date)
+        completed, total = record
+        day = {"completed": completed, "total": total} if (completed or total) else {}
+        masks = self.mask_array(year)
+        mask = masks.get(index) if masks is not None else 0
+        if mask:
+            day["mask"] = format(mask, "x")
+        day.update(self.extras.get(date, {}))
+        return day
+
+    def __setitem__(self, date, day):
+        year, index = self._locate(date)
+        self.year_array(year, create=True).set(index, day.get("completed", 0), day.get("total", 0))
+        mask = int(day.get("mask") or "0", 16)
+        masks = self.mask_array(year, mask)
+        if masks is not None:
+            masks.set(index, mask)
+        extras = {key: value for key, value in day.items() if key not in ("completed", "total", "mask") and value}
+        if extras:
+            self.extras[date] = extras
+        else:
+            self.extras.pop(date, None)
+
+    def __delitem__(self, date):
+        year, index = self._locate(date)
+        array = self.year_array(year)
+        if array is None or array.get(index) is None:
+            raise KeyError(date)
+        array.set(index, 0, ABSENT)
+        masks = self.mask_array(year)
+        if masks is not None:
+            masks.set(index, 0)
+        self.extras.pop(date, None)
+
+    def available_years(self):
+        years = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".days"):
+                year = int(name[:-5])
+                if self.year_array(year).present():
+                    years.append(year)
+        return sorted(years)
+
+    def __iter__(self):
+        for year in self.available_years():
+            start = datetime.date(year, 1, 1).toordinal()
+            for index in self.year_array(year).present():
+                yield datetime.date.fromordinal(start + index).isoformat()
+
+    def __len__(self):
+        return sum(len(self.year_array(year).present()) for year in self.available_years())
+
+    def counts(self, start_date, end_date):
+        """[start_date, end_date] 内每天的 (完成数列表, 总数列表)，直接从数组切片，不经过字典"""
+        completed, total = [], []
+        day = start_date
+        while day <= end_date:
+            year_end = min(end_date, datetime.date(day.year, 12, 31))
+            first, last = day_of_year(day), day_of_year(year_end)
+            array = self.year_array(day.year)
+            if array is None:
+                completed.extend([0] * (last - first + 1))
+                total.extend([0] * (last - first + 1))
+            else:
+                totals = array.values[2 * first + 1 : 2 * last + 2 : 2].tolist()
+                completed.extend(array.values[2 * first : 2 * last + 1 : 2].tolist())
+                total.extend(0 if value == ABSENT else value for value in totals)
+            day = year_end + datetime.timedelta(days=1)
+        return completed, total
+
+    def range(self, start_date, end_date):
+        return ArrayHistoryRange(self, start_date, end_date)
+
+    def flush(self):
+        for array in [*self.years.values(), *self.masks.values()]:
+            if array is not None:
+                array.flush()
+
+    def close(self):
+        for array in [*self.years.values(), *self.masks.values(), *self.retired]:
+            if array is not None:
+                array.close()
+        self.years.clear()
+        self.masks.clear()
+        self.retired.clear()
+
+
+class ArrayHistoryRange(Mapping):
+    """ArrayHistory 中一段日期范围的只读视图"""
+
+    def __init__(self, history, start_date, end_date):
+        self.history = history
+        self.start_date = start_date
+        self.end_date = end_date
+
+    def _in_range(self, date):
+        return self.start_date.isoformat() <= date <= self.end_date.isoformat()
+
+    def __getitem__(self, date):
+        if not self._in_range(date):
+            raise KeyError(date)
+        return self.history[date]
+
+    def __iter__(self):
+        ordinal = self.start_date.toordinal()
+        while ordinal <= self.end_date.toordinal():
+            date = datetime.date.fromordinal(ordinal).isoformat()
+            if date in self.history:
+                yield date
+            ordinal += 1
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def counts(self, start_date, end_date):
+        return self.history.counts(start_date, end_date)
@@ -0,0 +1,139 @@
+"""热路径计时与计数（默认关闭）
+
+DAILY_TASK_TRACE=1 时开启：
+- span(名称)：计时区间；traced(名称)：装饰函数，整个调用计为一个区间
+- count(名称, n)：累计计数（例如每秒悬停次数）；gauge(名称, 值)：瞬时值（例如画布部件总数）
+所有采样写进固定大小的环形缓冲区（只保留最近 RING_SIZE 条），dump() 导出为 Chrome trace
+格式（chrome://tracing、Perfetto 可直接打开）。
+
+未开启时 traced 直接返回原函数，span 返回共用的空上下文，count / gauge 只判断一次开关。
+"""
+
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+
+TRACE_ENABLED = os.environ.get("DAILY_TASK_TRACE") == "1"
+TRACE_FILE = os.environ.get("DAILY_TASK_TRACE_FILE", "daily_task_trace.json")
+RING_SIZE = 8192  # 环形缓冲区容量（条）
+
+
+class NullSpan:
+    """未开启时 span() 返回的空上下文"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add("X", self.name, self.start, time.perf_counter() - self.start, self.args)
+        return False
+
+
+class Tracer:
+    """区间 / 计数采样的环形缓冲区"""
+
+    def __init__(self, enabled=TRACE_ENABLED, size=RING_SIZE):
+        self.enabled = enabled
+        self.size = size
+        self.ring = [None] * size  # (类型, 名称, 开始, 时长, 参数, 线程)
+        self.sequence = itertools.count()  # 下一个写入位置（next() 在 CPython 中是原子的，多线程写入不会撞位）
+        self.written = 0
+        self.counters = {}  # 名称 -> 累计值
+        self.origin = time.perf_counter()
+
+    def add(self, kind, name, start, duration, args=None):
+        i = next(self.sequence)
+        self.ring[i % self.size] = (kind, name, start, duration, args, threading.get_ident())
+        self.written = i + 1
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, args or None)
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        total = self.counters[name] = self.counters.get(name, 0) + value
+        self.add("C", name, time.perf_counter(), 0, total)
+
+    def gauge(self, name, value):
+        if not self.enabled:
+            return
+        self.counters[name] = value
+        self.add("C", name, time.perf_counter(), 0, value)
+
+    def samples(self):
+        """环形缓冲区中的采样，按写入顺序"""
+        written = self.written
+        if written <= self.size:
+            return [sample for sample in self.ring[:written] if sample is not None]
+        start = written % self.size
+        return [sample for sample in self.ring[start:] + self.ring[:start] if sample is not None]
+
+    def span_stats(self):
+        """缓冲区内各区间的 (次数, 最近一次, 平均, 最大) 耗时（秒）"""
+        stats = {}
+        for kind, name, _, duration, _, _ in self.samples():
+            if kind != "X":
+                continue
+            count, _, total, peak = stats.get(name, (0, 0.0, 0.0, 0.0))
+            stats[name] = (count + 1, duration, total + duration, max(peak, duration))
+        return {name: (count, last, total / count, peak) for name, (count, last, total, peak) in stats.items()}
+
+    def dump(self, path=TRACE_FILE):
+        """导出为 Chrome trace 格式（JSON），返回写入的事件数"""
+        pid = os.getpid()
+        events = []
+        for kind, name, start, duration, args, tid in self.samples():
+            event = {"name": name, "ph": kind, "ts": (start - self.origin) * 1e6, "pid": pid, "tid": tid}
+            if kind == "X":
+                event["dur"] = duration * 1e6
+                if args:
+                    event["args"] = args
+            else:
+                event["args"] = {name: args}
+            events.append(event)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+
+TRACER = Tracer()
+
+
+def traced(name):
+    """函数装饰器：每次调用记为一个区间；未开启时原样返回函数，没有任何额外开销"""
+
+    def decorate(func):
+        if not TRACER.enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with TRACER.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
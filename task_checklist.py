@@ -0,0 +1,126 @@
+"""今日任务勾选列表
+
+TaskChecklist 只创建一屏（最多 VISIBLE_ROWS 行）的复选框，滚动时把这些行重新绑定到
+其他任务，任务再多也不会增加部件；勾选状态保存在 checked 集合中，与部件无关。
+set_tasks 按差异更新：只重新设置内容变化的行（文字 / 勾选 / 颜色），不销毁重建。
+"""
+
+import tkinter as tk
+
+VISIBLE_ROWS = 12  # 一屏最多显示的任务行数，超出后出现滚动条
+
+
+class TaskChecklist:
+    """可滚动的任务勾选列表，行部件按需复用"""
+
+    def __init__(self, master, visible_rows=VISIBLE_ROWS):
+        self.visible_rows = visible_rows
+        self.tasks = []
+        self.checked = set()  # 已勾选的任务
+        self.first = 0  # 第一行显示的任务下标
+        self.rows = []  # 行部件池：{"chk", "var", "task", "state"}
+
+        self.frame = tk.Frame(master)
+        self.frame.pack(fill="x")
+        self.frame.columnconfigure(0, weight=1)  # 让任务居中
+        self.scrollbar = tk.Scrollbar(self.frame, orient="vertical", command=self.on_scroll)
+        for widget in (self.frame, self.scrollbar):
+            self.bind_wheel(widget)
+
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1))
+        widget.bind("<Button-4>", lambda e: self.scroll_by(-1))  # Linux 滚轮
+        widget.bind("<Button-5>", lambda e: self.scroll_by(1))
+
+    # ========== 📌 数据 ==========
+
+    def set_tasks(self, tasks):
+        """更新任务列表（已删除任务的勾选一并丢弃），只改动变化的行"""
+        self.tasks = list(tasks)
+        self.checked &= set(self.tasks)
+        self.resize_pool()
+        self.first = max(min(self.first, len(self.tasks) - len(self.rows)), 0)
+        self.refresh()
+
+    def set_checked(self, checked):
+        self.checked = set(checked) & set(self.tasks)
+        self.refresh()
+
+    def get_checked(self):
+        return set(self.checked)
+
+    # ========== 📌 行部件 ==========
+
+    def resize_pool(self):
+        """行数 = min(任务数, 一屏行数)：不够时新建，多余的销毁"""
+        count = min(len(self.tasks), self.visible_rows)
+        while len(self.rows) < count:
+            self.rows.append(self.create_row(len(self.rows)))
+        while len(self.rows) > count:
+            self.rows.pop()["chk"].destroy()
+
+        if len(self.tasks) > self.visible_rows:
+            self.scrollbar.grid(row=0, column=1, rowspan=self.visible_rows, sticky="ns")
+        else:
+            self.scrollbar.grid_remove()
+
+    def create_row(self, row):
+        var = tk.IntVar(value=0)
+
+        # 统一字体 & 让文本居中
+        chk = tk.Checkbutton(
+            self.frame,
+            variable=var,
+            font=("微软雅黑", 12, "bold"),
+            anchor="center",
+            padx=10,
+            command=lambda: self.on_toggle(row),
+        )
+        chk.grid(row=row, column=0, sticky="nsew", padx=5, pady=0)  # 让它填充整列
+        self.bind_wheel(chk)
+        return {"chk": chk, "var": var, "task": None, "state": None}
+
+    def refresh(self):
+        """把每一行绑定到 first 之后对应的任务，内容没变的行不做任何修改"""
+        for offset, row in enumerate(self.rows):
+            task = self.tasks[self.first + offset]
+            done = task in self.checked
+            if row["task"] != task:
+                row["chk"].config(text=task)
+                row["task"] = task
+            if row["state"] != done:
+                row["var"].set(int(done))
+                row["chk"].config(fg="green" if done else "red")  # 完成 → 绿色，未完成 → 红色
+                row["state"] = done
+
+        if len(self.tasks) > self.visible_rows:
+            total = len(self.tasks)
+            self.scrollbar.set(self.first / total, (self.first + len(self.rows)) / total)
+
+    def on_toggle(self, row):
+        row = self.rows[row]
+        if row["var"].get():
+            self.checked.add(row["task"])
+        else:
+            self.checked.discard(row["task"])
+        self.refresh()
+
+    # ========== 📌 滚动 ==========
+
+    def scroll_to(self, first):
+        first = max(min(first, len(self.tasks) - len(self.rows)), 0)
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.first + rows)
+
+    def on_scroll(self, action, amount, unit=None):
+        """滚动条回调：("moveto", 比例) 或 ("scroll", n, "units" / "pages")"""
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.tasks)))
+        elif unit == "pages":
+            self.scroll_by(int(amount) * len(self.rows))
+        else:
+            self.scroll_by(int(amount))
@@ -0,0 +1,287 @@
+"""历史数据批量导入 / 导出（CSV、NDJSON），无界面运行
+
+逐天流式处理：导出按年份读取历史、边读边写；导入逐行校验，与已有的当天数据合并后
+每 BATCH_DAYS 天交给存储引擎写一次盘，不需要把文件或整份历史同时放进内存。
+
+    python task_io.py export history.csv --start 2025-01-01 --end 2025-12-31 --task 跑步
+    python task_io.py export - --format ndjson --user alice >> archive.ndjson
+    python task_io.py import archive.ndjson --user alice --on-conflict union
+
+每行一天：date、completed、total、tasks（当天勾选的任务名，CSV 中用 ; 分隔），
+可选 user 列用于多人数据合并在同一个文件中。
+"""
+
+import argparse
+import collections
+import csv
+import datetime
+import json
+import sys
+
+from heatmap_render import day_counts
+from task_storage import (
+    BACKENDS,
+    apply_record,
+    day_mask,
+    encode_mask,
+    mask_tasks,
+    open_storage,
+    task_index,
+    tasks_mask,
+)
+
+FIELDS = ["date", "completed", "total", "tasks"]
+TASK_SEPARATOR = ";"
+BATCH_DAYS = 500  # 导入时每多少天写一次盘
+MAX_REPORTED_ERRORS = 20  # 最多打印多少条校验错误
+CONFLICT_POLICIES = ("union", "replace", "keep")
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return "ndjson" if path.lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def open_stream(path, mode):
+    if path == "-":
+        return sys.stdout if "w" in mode else sys.stdin
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+# ========== 📌 导出 ==========
+
+
+def iter_days(storage, data, start_date, end_date):
+    """按日期顺序逐天产出 (日期, 当日数据)，一次只读取一年"""
+    for year in range(start_date.year, end_date.year + 1):
+        first = max(start_date, datetime.date(year, 1, 1))
+        last = min(end_date, datetime.date(year, 12, 31))
+        days = storage.history_range(data, first, last)
+        for date in sorted(days):
+            yield date, days[date]
+
+
+def export_rows(storage, data, start_date, end_date, tasks=None, user=None):
+    """导出的每一行；指定 tasks 时只统计这些任务（与热力图任务筛选一致）"""
+    task_mask = tasks_mask(data, tasks) if tasks else None
+    for date, day in iter_days(storage, data, start_date, end_date):
+        completed, total = day_counts(day, task_mask)
+        mask = day_mask(day) if task_mask is None else day_mask(day) & task_mask
+        row = {"date": date, "completed": completed, "total": total, "tasks": mask_tasks(data, mask)}
+        if user is not None:
+            row["user"] = user
+        yield row
+
+
+def write_rows(rows, stream, fmt, user=None):
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, FIELDS + (["user"] if user is not None else []))
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(dict(row, tasks=TASK_SEPARATOR.join(row["tasks"])))
+            count += 1
+    else:
+        for row in rows:
+            stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+# ========== 📌 导入 ==========
+
+
+def read_rows(stream, fmt):
+    """逐行读取，产出 (行号, 原始行)；NDJSON 中无法解析的行产出 (行号, None)"""
+    if fmt == "csv":
+        yield from enumerate(csv.DictReader(stream), 2)  # 第 1 行是表头
+    else:
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError:
+                yield line_number, None
+
+
+def validate_row(row):
+    """校验一行并规范化为 (日期, 完成数, 总数, 任务名列表或 None)，不合法时抛出 ValueError"""
+    if not isinstance(row, dict):
+        raise ValueError("不是 JSON 对象")
+    try:
+        date = datetime.date.fromisoformat(str(row.get("date", ""))).isoformat()
+    except ValueError:
+        raise ValueError(f"日期格式错误: {row.get('date')!r}（需为 YYYY-MM-DD）")
+    try:
+        completed, total = int(row.get("completed") or 0), int(row.get("total") or 0)
+    except (TypeError, ValueError):
+        raise ValueError("completed / total 需为整数")
+    if completed < 0 or completed > total:
+        raise ValueError(f"完成数 {completed} 与总数 {total} 不匹配")
+
+    tasks = row.get("tasks")
+    if isinstance(tasks, str):  # CSV
+        tasks = [task for task in tasks.split(TASK_SEPARATOR) if task] if tasks else []
+    elif tasks is not None and not (isinstance(tasks, list) and all(isinstance(task, str) for task in tasks)):
+        raise ValueError("tasks 需为任务名列表")
+    if tasks is not None and len(tasks) > completed:
+        raise ValueError(f"勾选了 {len(tasks)} 个任务，但完成数只有 {completed}")
+    return date, completed, total, tasks
+
+
+def merge_day(data, existing, completed, total, tasks, policy):
+    """导入的一天与已有的当天数据合并，返回新的当日数据；无需修改时返回 None"""
+    if existing and policy == "keep":
+        return None
+    if existing and policy == "union":
+        checked = set(mask_tasks(data, day_mask(existing))) | set(tasks or ())
+        completed = max(completed, existing.get("completed", 0), len(checked))
+        total = max(total, existing.get("total", 0), completed)
+    else:
+        checked = set(tasks or ())
+
+    day = dict(existing or {}, completed=completed, total=total)
+    mask = tasks_mask(data, checked)
+    if mask:
+        day["mask"] = encode_mask(mask)
+    else:
+        day.pop("mask", None)
+    return None if day == existing else day
+
+
+def import_rows(storage, data, rows, policy="union", user=None, add_tasks=True, dry_run=False, errors=None):
+    """逐行导入，返回 {"rows", "imported", "skipped", "invalid", "added_tasks"}"""
+    result = {"rows": 0, "imported": 0, "skipped": 0, "invalid": 0, "added_tasks": 0}
+    errors = [] if errors is None else errors
+    batch = []
+    pending = {}  # 本批中已合并、还没写盘的日期 -> 当日数据（文件中同一天出现多次时与它合并）
+    if dry_run:  # 只校验：修改应用到内存中的副本（历史只记新写的天），原数据和存储都不动
+        data = dict(
+            data,
+            tasks=list(data["tasks"]),
+            history=collections.ChainMap({}, data["history"]),
+            deleted_tasks=list(data.get("deleted_tasks", [])),
+            task_index=list(task_index(data)),
+        )
+
+    def flush():
+        if batch and dry_run:
+            for record in batch:
+                apply_record(data, record)
+        elif batch:
+            storage.save_changes(data, batch)
+        batch.clear()
+        pending.clear()
+
+    for line_number, row in rows:
+        if user is not None and isinstance(row, dict) and row.get("user", user) != user:
+            continue  # 其他人的数据
+        result["rows"] += 1
+        try:
+            date, completed, total, tasks = validate_row(row)
+        except ValueError as e:
+            result["invalid"] += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(f"第 {line_number} 行: {e}")
+            continue
+
+        unknown = list(dict.fromkeys(task for task in tasks or () if task not in data["tasks"]))
+        if unknown and add_tasks:
+            result["added_tasks"] += len(unknown)
+            batch.extend({"op": "add_task", "task": task} for task in unknown)
+            flush()  # 新任务的位号确定之后，当天的位图才能包含它
+        existing = pending[date] if date in pending else data["history"].get(date)
+        day = merge_day(data, existing, completed, total, tasks, policy)
+        if day is None:
+            result["skipped"] += 1
+            continue
+        batch.append({"op": "save_day", "date": date, "day": day})
+        pending[date] = day
+        result["imported"] += 1
+        if len(batch) >= BATCH_DAYS:
+            flush()
+    flush()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="历史数据批量导入 / 导出（CSV、NDJSON）")
+    parser.add_argument("--storage", choices=BACKENDS, help="存储方式（默认 DAILY_TASK_STORAGE）")
+    parser.add_argument("--path", help="数据文件路径")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="导出历史")
+    export.add_argument("output", help="输出文件（- 为标准输出）")
+    export.add_argument("--format", choices=("csv", "ndjson"), help="默认按扩展名（.ndjson / .jsonl 为 NDJSON）")
+    export.add_argument("--start", type=datetime.date.fromisoformat, help="开始日期（默认最早有记录的年份）")
+    export.add_argument("--end", type=datetime.date.fromisoformat, help="结束日期（默认今天）")
+    export.add_argument("--task", action="append", help="只统计这些任务（可重复）")
+    export.add_argument("--user", help="在每行写入 user 列（多人数据合并到一个文件时使用）")
+
+    load = commands.add_parser("import", help="导入历史并与已有数据合并")
+    load.add_argument("input", help="输入文件（- 为标准输入）")
+    load.add_argument("--format", choices=("csv", "ndjson"), help="默认按扩展名（.ndjson / .jsonl 为 NDJSON）")
+    load.add_argument(
+        "--on-conflict",
+        choices=CONFLICT_POLICIES,
+        default="union",
+        help="当天已有数据时：union 合并勾选（默认）、replace 覆盖、keep 保留原数据",
+    )
+    load.add_argument("--user", help="只导入 user 列为该值的行")
+    load.add_argument("--no-add-tasks", action="store_true", help="不添加文件中出现的新任务（忽略这些勾选）")
+    load.add_argument("--dry-run", action="store_true", help="只校验，不写入")
+    args = parser.parse_args(argv)
+
+    storage = open_storage(args.storage, args.path)
+    data = storage.load()
+    try:
+        if args.command == "export":
+            years = storage.available_years(data)
+            end_date = args.end or datetime.date.today()
+            start_date = args.start or (datetime.date(int(years[-1]), 1, 1) if years else end_date)
+            fmt = detect_format(args.output, args.format)
+            stream = open_stream(args.output, "w")
+            try:
+                count = write_rows(
+                    export_rows(storage, data, start_date, end_date, args.task, args.user), stream, fmt, args.user
+                )
+            finally:
+                if stream is not sys.stdout:
+                    stream.close()
+            print(f"✅ 已导出 {count} 天: {args.output}", file=sys.stderr)
+        else:
+            fmt = detect_format(args.input, args.format)
+            stream = open_stream(args.input, "r")
+            errors = []
+            try:
+                result = import_rows(
+                    storage,
+                    data,
+                    read_rows(stream, fmt),
+                    args.on_conflict,
+                    args.user,
+                    add_tasks=not args.no_add_tasks,
+                    dry_run=args.dry_run,
+                    errors=errors,
+                )
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+            for error in errors:
+                print(f"⚠ {error}", file=sys.stderr)
+            print(
+                f"{'🔍 校验' if args.dry_run else '✅ 已导入'} {result['rows']} 行: "
+                f"写入 {result['imported']} 天，无变化 {result['skipped']} 天，"
+                f"无效 {result['invalid']} 行，新任务 {result['added_tasks']} 个",
+                file=sys.stderr,
+            )
+            if result["invalid"]:
+                sys.exit(1)
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""可输入筛选的任务选择框
+
+TaskIndex 为任务名建立两种索引，添加 / 删除任务时只更新该任务名涉及的部分：
+- 按名称排序的列表：前缀匹配用二分查找，只取前 MAX_MATCHES 个
+- 字符 n-gram 倒排表（单字 + 相邻两字），中文等不用空格分词的名称同样适用：
+  子串查询取各二元组倒排表的交集，再确认确实包含查询串
+候选很多时按任务顺序扫描、凑够数量即停，候选很少时直接排序，查询耗时与任务总数基本无关。
+
+TaskPicker 是输入框 + 候选列表，替代原来的 OptionMenu（任务多时菜单无法使用）。
+"""
+
+import bisect
+import heapq
+import itertools
+import tkinter as tk
+
+MAX_MATCHES = 50  # 候选列表最多显示的任务数
+LIST_ROWS = 6  # 候选列表高度（行）
+BULK_ADD = 64  # 一次新增超过这么多任务（首次加载、导入）时追加后整体排序，否则逐个二分插入
+
+
+def ngrams(text):
+    text = text.casefold()
+    grams = set(text)
+    grams.update(text[i : i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+class TaskIndex:
+    """任务名的 n-gram 倒排索引，支持前缀和子串查询"""
+
+    def __init__(self, tasks=()):
+        self.order = {}  # 任务名 -> 在任务列表中的位置（结果排序用）
+        self.folded = {}  # 任务名 -> 不区分大小写的形式
+        self.names = []  # [(不区分大小写的名称, 任务名)]，有序
+        self.postings = {}  # n-gram -> 含有它的任务名集合
+        self.set_tasks(tasks)
+
+    def add(self, task):
+        self._add_postings(task)
+        bisect.insort(self.names, (self.folded[task], task))
+
+    def _add_postings(self, task):
+        self.folded[task] = task.casefold()
+        for gram in ngrams(task):
+            self.postings.setdefault(gram, set()).add(task)
+
+    def remove(self, task):
+        folded = self.folded.pop(task)
+        del self.names[bisect.bisect_left(self.names, (folded, task))]
+        for gram in ngrams(task):
+            names = self.postings.get(gram)
+            if names is not None:
+                names.discard(task)
+                if not names:
+                    del self.postings[gram]
+
+    def set_tasks(self, tasks):
+        """按新的任务列表更新：只为新增 / 删除的任务修改倒排表"""
+        order = {task: i for i, task in enumerate(tasks)}
+        for task in self.order.keys() - order.keys():
+            self.remove(task)
+        added = order.keys() - self.order.keys()
+        if len(added) > BULK_ADD:
+            for task in added:
+                self._add_postings(task)
+                self.names.append((self.folded[task], task))
+            self.names.sort()
+        else:
+            for task in added:  # 平时每次只增删一两个任务：二分插入，不重排整个列表
+                self.add(task)
+        self.order = order
+
+    def search(self, query, limit=MAX_MATCHES):
+        """包含 query 的任务（不区分大小写），前缀匹配在前，其余按任务列表顺序"""
+        query = query.strip().casefold()
+        if not query:
+            return list(itertools.islice(self.order, limit))
+
+        # ✅ 前缀匹配：有序列表中二分定位，最多取 limit 个
+        prefixed = []
+        i = bisect.bisect_left(self.names, (query,))
+        while i < len(self.names) and len(prefixed) < limit and self.names[i][0].startswith(query):
+            prefixed.append(self.names[i][1])
+            i += 1
+        prefixed.sort(key=self.order.__getitem__)
+        if len(prefixed) == limit:
+            return prefixed
+
+        # ✅ 其余子串匹配：二元组倒排表求交集（从最短的表开始）
+        grams = {query} if len(query) == 1 else {query[i : i + 2] for i in range(len(query) - 1)}
+        postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        candidates = postings[0].intersection(*postings[1:]).difference(prefixed)
+        wanted = limit - len(prefixed)
+        if len(candidates) * 8 < len(self.order):  # 候选少 → 直接取任务顺序最靠前的
+            matches = heapq.nsmallest(
+                wanted, (task for task in candidates if query in self.folded[task]), key=self.order.__getitem__
+            )
+        else:  # 候选多 → 按任务顺序扫描，很快就能凑够
+            matches = itertools.islice(
+                (task for task in self.order if task in candidates and query in self.folded[task]), wanted
+            )
+        return prefixed + list(matches)
+
+
+class TaskPicker:
+    """输入框 + 候选列表：输入时按索引筛选，回车或点击候选项选中"""
+
+    def __init__(self, row, variable, on_resize=None):
+        self.row = row
+        self.variable = variable
+        self.on_resize = on_resize  # 候选列表显示 / 隐藏后调用（调整窗口高度）
+        self.index = TaskIndex()
+        self.matches = []
+        self.visible = False
+        self.selecting = False  # 程序设置输入框内容时不触发筛选
+
+        self.entry = tk.Entry(row, textvariable=variable, font=("微软雅黑", 12, "bold"), width=10)
+        self.entry.pack(side="left", padx=5, pady=5)
+        self.listbox = tk.Listbox(row.master, height=LIST_ROWS, font=("微软雅黑", 11))
+
+        variable.trace_add("write", self.on_type)
+        self.entry.bind("<Return>", self.choose_first)
+        self.entry.bind("<Down>", self.focus_list)
+        self.entry.bind("<Escape>", lambda e: self.hide())
+        self.listbox.bind("<<ListboxSelect>>", self.on_select)
+        self.listbox.bind("<Return>", self.on_select)
+        self.listbox.bind("<Escape>", lambda e: self.hide())
+
+    def set_tasks(self, tasks):
+        self.index.set_tasks(tasks)
+        if self.visible:
+            self.refresh()
+
+    def select(self, task):
+        self.selecting = True
+        self.variable.set(task)
+        self.selecting = False
+        self.hide()
+
+    # ========== 📌 候选列表 ==========
+
+    def on_type(self, *args):
+        if not self.selecting:
+            self.refresh()
+
+    def refresh(self):
+        text = self.variable.get()
+        self.matches = self.index.search(text)
+        if not self.matches or self.matches == [text]:  # 没有候选 / 已经是完整的任务名
+            self.hide()
+            return
+        self.listbox.delete(0, "end")
+        self.listbox.insert("end", *self.matches)
+        if not self.visible:
+            self.listbox.pack(fill="x", padx=5, after=self.row)
+            self.visible = True
+            if self.on_resize is not None:
+                self.on_resize()
+
+    def hide(self):
+        if self.visible:
+            self.listbox.pack_forget()
+            self.visible = False
+            if self.on_resize is not None:
+                self.on_resize()
+
+    def choose_first(self, event=None):
+        if self.matches:
+            self.select(self.matches[0])
+
+    def focus_list(self, event=None):
+        if self.visible:
+            self.listbox.focus_set()
+            self.listbox.selection_clear(0, "end")
+            self.listbox.selection_set(0)
+
+    def on_select(self, event=None):
+        selection = self.listbox.curselection()
+        if selection:
+            self.select(self.matches[selection[0]])
+            self.entry.focus_set()
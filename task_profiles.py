@@ -0,0 +1,197 @@
+"""多人配置（工作区）与批量报告
+
+每个配置一份独立的数据：默认配置沿用当前目录下的数据文件（与之前相同），
+其他配置放在 PROFILE_DIR/<名称>/ 下，文件名与各存储方式的默认文件名相同。
+
+批量报告只读地读取各配置的数据（不修改任何数据文件），在进程池中并行为每个配置生成
+年度汇总和热力图 PNG，最后写出 report.json：
+
+    python task_profiles.py list
+    python task_profiles.py create alice
+    python task_profiles.py report --year 2025 --output reports --workers 4
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from heatmap_render import build_grid, view_range, write_png
+from task_stats import load_stats
+from task_storage import ARRAY_DIR, BACKENDS, DATA_FILE, DB_FILE, DEFAULT_BACKEND, SHARD_DIR, open_storage
+
+PROFILE_DIR = os.environ.get("DAILY_TASK_PROFILE_DIR", "profiles")
+DEFAULT_PROFILE = "default"
+PROFILE_FILES = {  # 各存储方式在配置目录中的文件名
+    "json": DATA_FILE,
+    "journal": DATA_FILE,
+    "sqlite": DB_FILE,
+    "array": ARRAY_DIR,
+    "sharded": SHARD_DIR,
+}
+MAX_WORKERS = 8  # 批量报告最多同时运行的进程数
+INVALID_NAME_CHARS = set('/\\:*?"<>|')
+
+
+def check_name(name):
+    if not name or name.startswith(".") or INVALID_NAME_CHARS & set(name):
+        raise ValueError(f"配置名称不合法: {name!r}")
+    return name
+
+
+def list_profiles(root=PROFILE_DIR):
+    """默认配置在前，其余按名称排序"""
+    names = []
+    if os.path.isdir(root):
+        names = sorted(
+            name for name in os.listdir(root) if name != DEFAULT_PROFILE and os.path.isdir(os.path.join(root, name))
+        )
+    return [DEFAULT_PROFILE] + names
+
+
+def create_profile(name, root=PROFILE_DIR):
+    if check_name(name) == DEFAULT_PROFILE or os.path.isdir(os.path.join(root, name)):
+        raise ValueError(f"配置已存在: {name}")
+    os.makedirs(os.path.join(root, name))
+
+
+def profile_path(name, backend=None, root=PROFILE_DIR):
+    """配置的数据文件路径；默认配置返回 None（使用存储方式自己的默认路径）"""
+    if name == DEFAULT_PROFILE:
+        return None
+    return os.path.join(root, check_name(name), PROFILE_FILES[backend or DEFAULT_BACKEND])
+
+
+def open_profile(name, backend=None, root=PROFILE_DIR):
+    path = profile_path(name, backend, root)
+    if path is not None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    return open_storage(backend, path)
+
+
+def read_profile(name, backend=None, root=PROFILE_DIR):
+    """只读打开配置（批量报告用）：不创建目录、不初始化数据、不修复 / 压缩日志
+
+    返回 (存储引擎, 数据)；配置或数据文件不存在时抛出 ValueError
+    """
+    if name != DEFAULT_PROFILE and not os.path.isdir(os.path.join(root, check_name(name))):
+        raise ValueError(f"配置不存在: {name}")
+    storage = open_storage(backend, profile_path(name, backend, root))
+    if not storage.exists():
+        raise ValueError(f"配置 {name} 还没有数据: {storage.path}")
+    return storage, storage.read_state()
+
+
+# ========== 📌 批量报告 ==========
+
+
+def profile_report(name, year, output_dir, backend=None, root=PROFILE_DIR, today=None):
+    """在子进程中运行：一个配置的年度汇总 + 热力图 PNG"""
+    today = today or datetime.date.today()
+    storage, data = read_profile(name, backend, root)
+    try:
+        start_date, end_date = view_range(year, today)
+        grid = build_grid(storage.history_range(data, start_date, end_date), start_date, end_date)
+        image = os.path.join(output_dir, f"{name}-{year}.png")
+        write_png(grid, image)
+        stats = load_stats(storage, data, today)
+    finally:
+        storage.close()
+
+    first, last = datetime.date(year, 1, 1), min(datetime.date(year, 12, 31), today)
+    completed, total = stats.totals(first, last)
+    return {
+        "profile": name,
+        "year": year,
+        "tasks": len(data["tasks"]),
+        "completed": completed,
+        "total": total,
+        "rate": completed / total if total else 0.0,
+        "best_streak": stats.best_streak(first, last)[0],
+        "streak": stats.streak(today)[0],
+        "heatmap": image,
+    }
+
+
+def default_workers():
+    return min(os.cpu_count() or 1, MAX_WORKERS)
+
+
+def run_reports(profiles, year, output_dir, workers=None, backend=None, root=PROFILE_DIR, progress=None):
+    """进程池并行生成各配置的报告，返回 (按配置顺序的结果, {配置: 错误信息})
+
+    progress(已完成数, 总数, 配置名, 错误信息或 None) 在每个配置完成时调用
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max(1, min(workers or default_workers(), len(profiles)))
+    today = datetime.date.today()
+    results, errors = {}, {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(profile_report, name, year, output_dir, backend, root, today): name for name in profiles
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:  # 一个配置出错不影响其他配置
+                errors[name] = f"{type(e).__name__}: {e}"
+            if progress is not None:
+                progress(done, len(futures), name, errors.get(name))
+    return [results[name] for name in profiles if name in results], errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多人配置管理与批量报告")
+    parser.add_argument("--storage", choices=BACKENDS, help="存储方式（默认 DAILY_TASK_STORAGE）")
+    parser.add_argument("--root", default=PROFILE_DIR, help="配置目录（默认 DAILY_TASK_PROFILE_DIR 或 profiles）")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="列出所有配置")
+    create = commands.add_parser("create", help="新建配置")
+    create.add_argument("name")
+
+    report = commands.add_parser("report", help="并行生成各配置的年度汇总和热力图")
+    report.add_argument("--year", type=int, default=datetime.date.today().year, help="年份（默认今年）")
+    report.add_argument("--output", default="reports", help="输出目录（热力图 PNG 与 report.json）")
+    report.add_argument("--workers", type=int, help=f"进程数（默认 CPU 核数，最多 {MAX_WORKERS}）")
+    report.add_argument("--profile", action="append", help="只处理这些配置（可重复，默认全部）")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        print("\n".join(list_profiles(args.root)))
+    elif args.command == "create":
+        try:
+            create_profile(args.name, args.root)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"✅ 已创建配置: {args.name}")
+    else:
+        profiles = args.profile or list_profiles(args.root)
+        unknown = [name for name in profiles if name not in list_profiles(args.root)]
+        if unknown:
+            parser.error(f"配置不存在: {', '.join(unknown)}")
+
+        def progress(done, total, name, error):
+            print(f"[{done}/{total}] {name} {'❌ ' + error if error else '✅'}", file=sys.stderr)
+
+        results, errors = run_reports(
+            profiles, args.year, args.output, args.workers, args.storage, args.root, progress
+        )
+        path = os.path.join(args.output, "report.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"year": args.year, "profiles": results, "errors": errors}, f, ensure_ascii=False, indent=4)
+        for result in results:
+            print(
+                f"{result['profile']:<16} {result['completed']}/{result['total']} 任务完成（{result['rate']:.0%}）"
+                f" · 最长连续 {result['best_streak']} 天 · 当前连续 {result['streak']} 天"
+            )
+        print(f"📄 报告已写入 {path}", file=sys.stderr)
+        if errors:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
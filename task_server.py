@@ -0,0 +1,292 @@
+"""本地 HTTP / JSON 接口
+
+无界面运行，供脚本、手机快捷指令、状态栏等读取和勾选任务：
+
+    python task_server.py --port 8765
+
+接口（均返回 JSON）：
+- GET    /tasks                          任务列表
+- POST   /tasks          {"task": 名称}   添加任务
+- DELETE /tasks/<名称>                    删除任务
+- GET    /today                          今日各任务勾选状态与完成数
+- POST   /today          {"task": 名称, "done": true/false}  勾选 / 取消勾选今日任务
+- GET    /history?start=YYYY-MM-DD&end=YYYY-MM-DD  日期范围内的历史
+- GET    /years                          有数据的年份
+- GET    /summary/<年份>                  年度汇总（记录天数、完成数、总数、完成率）
+
+所有请求共享进程内同一份数据（启动时读取一次），读请求直接读内存；
+写请求在事件循环中同步修改内存（中间没有 await，天然串行，不需要加锁），写盘交给后台写入线程。
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import sys
+import traceback
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from task_storage import BACKENDS, BackgroundWriter, checked_day, checked_tasks, open_storage
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY = 64 * 1024  # 请求体上限
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    500: "Internal Server Error",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class TrackerService:
+    """共享的内存数据模型 + 各接口的实现（与 HTTP 无关）"""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.data = storage.load()
+        self.writer = BackgroundWriter(storage)
+        self.summaries = {}  # 年份 -> 年度汇总，该年数据变化时作废
+
+    def change(self, record):
+        self.writer.save_change(self.data, record)
+        if "date" in record:
+            self.summaries.pop(record["date"][:4], None)
+
+    # ========== 📌 读 ==========
+
+    def get_tasks(self):
+        return {"tasks": list(self.data["tasks"])}
+
+    def get_today(self):
+        date = datetime.date.today().isoformat()
+        checked = set(checked_tasks(self.data, date))
+        return {
+            "date": date,
+            "tasks": {task: int(task in checked) for task in self.data["tasks"]},
+            "completed": len(checked),
+            "total": len(self.data["tasks"]),
+        }
+
+    def get_history(self, start, end):
+        try:
+            start_date = datetime.date.fromisoformat(start)
+            end_date = datetime.date.fromisoformat(end)
+        except (TypeError, ValueError):
+            raise ApiError(400, "start / end 需为 YYYY-MM-DD")
+        # ✅ 范围收紧到有数据的年份：0001-01-01 ~ 9999-12-31 这样的请求不会在事件循环里逐天扫描几百万天
+        years = self.storage.available_years(self.data)
+        if not years:
+            return {"history": {}}
+        start_date = max(start_date, datetime.date(int(years[-1]), 1, 1))
+        end_date = min(end_date, datetime.date(int(years[0]), 12, 31))
+        return {"history": dict(self.storage.history_range(self.data, start_date, end_date))}
+
+    def get_years(self):
+        return {"years": self.storage.available_years(self.data)}
+
+    def get_summary(self, year):
+        if not (year.isascii() and year.isdigit()):
+            raise ApiError(400, "年份需为数字")
+        if not datetime.MINYEAR <= int(year) <= datetime.MAXYEAR:
+            raise ApiError(400, f"年份需在 {datetime.MINYEAR} 到 {datetime.MAXYEAR} 之间")
+        if year not in self.summaries:
+            days = self.storage.history_range(
+                self.data, datetime.date(int(year), 1, 1), datetime.date(int(year), 12, 31)
+            )
+            completed = sum(day.get("completed", 0) for day in days.values())
+            total = sum(day.get("total", 0) for day in days.values())
+            self.summaries[year] = {
+                "year": year,
+                "days": len(days),
+                "completed": completed,
+                "total": total,
+                "rate": completed / total if total else 0.0,
+            }
+        return self.summaries[year]
+
+    # ========== 📌 写 ==========
+
+    def add_task(self, body):
+        task = body.get("task")
+        if not isinstance(task, str) or not task:
+            raise ApiError(400, "缺少任务名称")
+        if task in self.data["tasks"]:
+            raise ApiError(409, f"任务已存在: {task}")
+        self.change({"op": "add_task", "task": task})
+        return self.get_tasks()
+
+    def delete_task(self, task):
+        if task not in self.data["tasks"]:
+            raise ApiError(404, f"任务不存在: {task}")
+        self.change({"op": "delete_task", "task": task})
+        return self.get_tasks()
+
+    def mark_today(self, body):
+        task = body.get("task")
+        if task not in self.data["tasks"]:
+            raise ApiError(404, f"任务不存在: {task}")
+        date = datetime.date.today().isoformat()
+        checked = set(checked_tasks(self.data, date))
+        if body.get("done", True):
+            checked.add(task)
+        else:
+            checked.discard(task)
+        self.change({"op": "save_day", "date": date, "day": checked_day(self.data, date, checked)})
+        return self.get_today()
+
+    # ========== 📌 路由 ==========
+
+    def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        route = parts[0]
+
+        if route == "tasks" and len(parts) == 1:
+            if method == "GET":
+                return 200, self.get_tasks()
+            if method == "POST":
+                return 201, self.add_task(body)
+        elif route == "tasks" and len(parts) == 2:
+            if method == "DELETE":
+                return 200, self.delete_task(parts[1])
+        elif route == "today" and len(parts) == 1:
+            if method == "GET":
+                return 200, self.get_today()
+            if method == "POST":
+                return 200, self.mark_today(body)
+        elif route == "history" and len(parts) == 1:
+            if method == "GET":
+                return 200, self.get_history(query.get("start"), query.get("end"))
+        elif route == "years" and len(parts) == 1:
+            if method == "GET":
+                return 200, self.get_years()
+        elif route == "summary" and len(parts) == 2:
+            if method == "GET":
+                return 200, self.get_summary(parts[1])
+        else:
+            raise ApiError(404, f"未知接口: {url.path}")
+        raise ApiError(405, f"{url.path} 不支持 {method}")
+
+    def close(self):
+        self.writer.close()
+        self.storage.close()
+
+
+async def read_request(reader):
+    """读取一个 HTTP/1.1 请求，连接已关闭返回 None"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise ApiError(400, "请求行格式错误")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise ApiError(400, "Content-Length 需为整数")
+    if length < 0:
+        raise ApiError(400, "Content-Length 不能为负数")
+    if length > MAX_BODY:
+        raise ApiError(400, "请求体过大")
+    body = {}
+    if length:
+        try:
+            body = json.loads(await reader.readexactly(length))
+        except ValueError:
+            raise ApiError(400, "请求体不是合法的 JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "请求体需为 JSON 对象")
+    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    return method, target, body, keep_alive
+
+
+def encode_response(status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def handle_connection(service, reader, writer):
+    """一个连接上依次处理多个请求（keep-alive）"""
+    try:
+        while True:
+            request, keep_alive = None, False  # 请求没有完整读出时不能继续复用连接
+            try:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, body, keep_alive = request
+                status, payload = service.dispatch(method, target, body)
+            except ApiError as e:
+                status, payload, keep_alive = e.status, {"error": str(e)}, False
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception:  # 接口或存储中的意外错误：记下来并返回 500，不让连接无声断开
+                print(f"❌ 处理请求出错: {' '.join(request[:2]) if request else '读取请求时'}", file=sys.stderr)
+                traceback.print_exc()
+                status, payload = 500, {"error": "服务器内部错误"}
+            writer.write(encode_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(service, reader, writer), host, port
+    )
+    address = server.sockets[0].getsockname()
+    print(f"🌐 任务接口已启动: http://{address[0]}:{address[1]}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="每日任务追踪器本地 HTTP / JSON 接口")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"监听地址（默认 {DEFAULT_HOST}，仅本机）")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"端口（默认 {DEFAULT_PORT}）")
+    parser.add_argument("--storage", choices=BACKENDS, help="存储方式（默认 DAILY_TASK_STORAGE）")
+    parser.add_argument("--path", help="数据文件路径")
+    args = parser.parse_args()
+
+    service = TrackerService(open_storage(args.storage, args.path))
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()  # 写完尚未写盘的修改
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""完成情况统计：连续天数、任意日期范围的完成率
+
+CompletionStats 按日期序数保存每天的完成数 / 总数及其前缀和，另外记录“连续有完成的天”
+组成的区间（游程）：
+- 任意日期范围的完成数、总数、完成率：前缀和相减，O(1)
+- 某天所在的连续天数：二分查找游程，O(log n)
+- 全部历史的最长连续：缓存；任意范围内的最长连续：游程长度的稀疏表，O(1)（修改后按需重建）
+修改某天只需调整这一天之后的前缀和，保存今天的进度是 O(1)。
+
+命令行：
+
+    python task_stats.py
+    python task_stats.py --start 2025-01-01 --end 2025-03-31
+"""
+
+import argparse
+import bisect
+import datetime
+import json
+from itertools import accumulate
+
+
+def to_date(date):
+    return datetime.date.fromisoformat(date) if isinstance(date, str) else date
+
+
+def shift_year(date, years):
+    """同月同日的往年 / 来年日期（2 月 29 日对应 2 月 28 日）"""
+    try:
+        return date.replace(year=date.year + years)
+    except ValueError:
+        return date.replace(year=date.year + years, day=28)
+
+
+class CompletionStats:
+    """每天的完成数 / 总数前缀和 + 连续完成的区间"""
+
+    def __init__(self, start_date, completed=(), total=()):
+        self.start_ordinal = to_date(start_date).toordinal()
+        self.completed = list(completed)
+        self.total = list(total)
+        self.rebuild()
+
+    @classmethod
+    def from_history(cls, history, start_date, end_date):
+        """从 {日期: 当日数据} 构建；数组形式的历史直接切片"""
+        if hasattr(history, "counts"):
+            completed, total = history.counts(start_date, end_date)
+            return cls(start_date, completed, total)
+        completed, total = [], []
+        for ordinal in range(start_date.toordinal(), end_date.toordinal() + 1):
+            day = history.get(datetime.date.fromordinal(ordinal).isoformat()) or {}
+            completed.append(day.get("completed", 0))
+            total.append(day.get("total", 0))
+        return cls(start_date, completed, total)
+
+    def rebuild(self):
+        self.cum_completed = list(accumulate(self.completed, initial=0))
+        self.cum_total = list(accumulate(self.total, initial=0))
+        self.starts, self.ends = [], []  # 连续完成的区间 [starts[k], ends[k]]（下标），按开始排序
+        for i, completed in enumerate(self.completed):
+            if completed:
+                if self.ends and self.ends[-1] == i - 1:
+                    self.ends[-1] = i
+                else:
+                    self.starts.append(i)
+                    self.ends.append(i)
+        self.invalidate()
+
+    def invalidate(self):
+        self.best = None  # 最长连续的游程下标，按需计算
+        self.sparse = None  # 游程长度的稀疏表，按需构建
+
+    # ========== 📌 修改 ==========
+
+    def index(self, date):
+        return to_date(date).toordinal() - self.start_ordinal
+
+    def set_day(self, date, day):
+        """某天的数据变化（day 为 None 表示删除）：调整其后的前缀和与所在的游程"""
+        i = self.index(date)
+        if i < 0:  # 比已有数据更早：在前面补 0 后整体重建（很少发生）
+            self.completed[:0] = [0] * -i
+            self.total[:0] = [0] * -i
+            self.start_ordinal += i
+            self.rebuild()
+            i = 0
+        while i >= len(self.completed):  # 新的一天：在末尾补 0
+            self.completed.append(0)
+            self.total.append(0)
+            self.cum_completed.append(self.cum_completed[-1])
+            self.cum_total.append(self.cum_total[-1])
+
+        completed, total = (day.get("completed", 0), day.get("total", 0)) if day else (0, 0)
+        delta_completed, delta_total = completed - self.completed[i], total - self.total[i]
+        was_done = self.completed[i] > 0
+        self.completed[i], self.total[i] = completed, total
+        if delta_completed or delta_total:
+            for k in range(i + 1, len(self.cum_completed)):  # 保存今天时只有一项
+                self.cum_completed[k] += delta_completed
+                self.cum_total[k] += delta_total
+        if was_done != (completed > 0):
+            self.mark_run(i, completed > 0)
+
+    def mark_run(self, i, done):
+        k = bisect.bisect_right(self.starts, i) - 1  # 开始不晚于 i 的最后一个游程
+        if done:
+            joins_left = k >= 0 and self.ends[k] == i - 1
+            joins_right = k + 1 < len(self.starts) and self.starts[k + 1] == i + 1
+            if joins_left and joins_right:  # 两个游程连成一个
+                self.ends[k] = self.ends[k + 1]
+                del self.starts[k + 1], self.ends[k + 1]
+            elif joins_left:
+                self.ends[k] = i
+            elif joins_right:
+                self.starts[k + 1] = i
+            else:
+                self.starts.insert(k + 1, i)
+                self.ends.insert(k + 1, i)
+        else:  # 从所在的游程中去掉 i：可能分成两段
+            start, end = self.starts[k], self.ends[k]
+            del self.starts[k], self.ends[k]
+            if i < end:
+                self.starts.insert(k, i + 1)
+                self.ends.insert(k, end)
+            if start < i:
+                self.starts.insert(k, start)
+                self.ends.insert(k, i - 1)
+        self.invalidate()
+
+    # ========== 📌 查询 ==========
+
+    def clip(self, start_date, end_date):
+        first = max(self.index(start_date), 0)
+        last = min(self.index(end_date), len(self.completed) - 1)
+        return first, last
+
+    def totals(self, start_date, end_date):
+        """[start_date, end_date] 内的 (完成数, 总数)"""
+        first, last = self.clip(start_date, end_date)
+        if first > last:
+            return 0, 0
+        return (
+            self.cum_completed[last + 1] - self.cum_completed[first],
+            self.cum_total[last + 1] - self.cum_total[first],
+        )
+
+    def rate(self, start_date, end_date):
+        completed, total = self.totals(start_date, end_date)
+        return completed / total if total else 0.0
+
+    def run_dates(self, start, end):
+        return (
+            end - start + 1,
+            datetime.date.fromordinal(self.start_ordinal + start).isoformat(),
+            datetime.date.fromordinal(self.start_ordinal + end).isoformat(),
+        )
+
+    def streak(self, date):
+        """截至 date 的连续天数 (天数, 开始, 结束)；date 当天还没完成时算到前一天"""
+        i = min(self.index(date), len(self.completed))
+        k = bisect.bisect_right(self.starts, i) - 1
+        if k < 0 or self.ends[k] < i - 1:
+            return 0, None, None
+        return self.run_dates(self.starts[k], min(self.ends[k], i))
+
+    def best_streak(self, start_date=None, end_date=None):
+        """最长连续 (天数, 开始, 结束)；给出范围时只算范围内的部分"""
+        if not self.starts:
+            return 0, None, None
+        if start_date is None and end_date is None:
+            if self.best is None:
+                self.best = max(range(len(self.starts)), key=lambda k: self.ends[k] - self.starts[k])
+            return self.run_dates(self.starts[self.best], self.ends[self.best])
+
+        first, last = self.clip(start_date or datetime.date.min, end_date or datetime.date.max)
+        lo = bisect.bisect_left(self.ends, first)  # 第一个结束不早于 first 的游程
+        hi = bisect.bisect_right(self.starts, last) - 1  # 最后一个开始不晚于 last 的游程
+        if lo > hi:
+            return 0, None, None
+        # 两端的游程按范围截断，中间的完整游程用稀疏表取最长
+        candidates = [(max(self.starts[lo], first), min(self.ends[lo], last))]
+        candidates.append((max(self.starts[hi], first), min(self.ends[hi], last)))
+        if hi - lo > 1:
+            k = self.longest_run(lo + 1, hi - 1)
+            candidates.append((self.starts[k], self.ends[k]))
+        start, end = max(candidates, key=lambda run: run[1] - run[0])
+        return self.run_dates(start, end)
+
+    def longest_run(self, lo, hi):
+        """游程 lo..hi 中最长的一个（稀疏表区间最大值查询）"""
+        if self.sparse is None:
+            lengths = [end - start for start, end in zip(self.starts, self.ends)]
+            table = [list(range(len(lengths)))]
+            width = 1
+            while width * 2 <= len(lengths):
+                previous = table[-1]
+                table.append(
+                    [
+                        max(previous[k], previous[k + width], key=lengths.__getitem__)
+                        for k in range(len(lengths) - width * 2 + 1)
+                    ]
+                )
+                width *= 2
+            self.sparse = (lengths, table)
+        lengths, table = self.sparse
+        level = (hi - lo + 1).bit_length() - 1
+        row = table[level]
+        return max(row[lo], row[hi - (1 << level) + 1], key=lengths.__getitem__)
+
+    def summary(self, today):
+        """热力图面板 / 命令行显示的概览"""
+        today = to_date(today)
+        year_start = today.replace(month=1, day=1)
+        return {
+            "streak": self.streak(today)[0],
+            "best_streak": self.best_streak()[0],
+            "last_7_days": self.rate(today - datetime.timedelta(days=6), today),
+            "last_30_days": self.rate(today - datetime.timedelta(days=29), today),
+            "this_month": self.rate(today.replace(day=1), today),
+            "this_year": self.rate(year_start, today),
+            "last_year_same_period": self.rate(shift_year(year_start, -1), shift_year(today, -1)),
+        }
+
+
+# 统计整个历史（最早有记录的年份 1 月 1 日 ~ today）
+def load_stats(storage, data, today=None):
+    today = today or datetime.date.today()
+    years = storage.available_years(data)
+    start_date = datetime.date(int(years[-1]), 1, 1) if years else today
+    start_date = min(start_date, today)
+    return CompletionStats.from_history(storage.history_range(data, start_date, today), start_date, today)
+
+
+def format_summary(summary):
+    return (
+        f"🔥 连续 {summary['streak']} 天 · 最长 {summary['best_streak']} 天 · "
+        f"近 7 天 {summary['last_7_days']:.0%} · 本月 {summary['this_month']:.0%} · "
+        f"今年 {summary['this_year']:.0%}（去年同期 {summary['last_year_same_period']:.0%}）"
+    )
+
+
+def main():
+    from task_storage import BACKENDS, open_storage
+
+    parser = argparse.ArgumentParser(description="任务完成情况统计（连续天数、完成率）")
+    parser.add_argument("--start", type=datetime.date.fromisoformat, help="统计范围开始日期 YYYY-MM-DD")
+    parser.add_argument("--end", type=datetime.date.fromisoformat, help="统计范围结束日期（默认今天）")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    parser.add_argument("--storage", choices=BACKENDS, help="存储方式（默认 DAILY_TASK_STORAGE）")
+    parser.add_argument("--path", help="数据文件路径")
+    args = parser.parse_args()
+
+    storage = open_storage(args.storage, args.path)
+    data = storage.load()
+    today = datetime.date.today()
+    stats = load_stats(storage, data, today)
+    storage.close()
+
+    result = {"summary": stats.summary(today)}
+    if args.start or args.end:
+        start_date, end_date = args.start or datetime.date.min, args.end or today
+        completed, total = stats.totals(start_date, end_date)
+        length, first, last = stats.best_streak(start_date, end_date)
+        result["range"] = {
+            "start": args.start.isoformat() if args.start else None,
+            "end": end_date.isoformat(),
+            "completed": completed,
+            "total": total,
+            "rate": completed / total if total else 0.0,
+            "best_streak": {"days": length, "start": first, "end": last},
+        }
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=4))
+        return
+    print(format_summary(result["summary"]))
+    if "range" in result:
+        span = result["range"]
+        streak = span["best_streak"]
+        print(
+            f"📅 {span['start'] or '最早'} ~ {span['end']}: {span['completed']}/{span['total']} 任务完成"
+            f"（{span['rate']:.0%}），最长连续 {streak['days']} 天"
+            + (f"（{streak['start']} ~ {streak['end']}）" if streak["days"] else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
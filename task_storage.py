@@ -0,0 +1,1171 @@
+"""任务数据存储
+
+load / save 背后的可插拔存储引擎：
+- json:    整文件 JSON（原始格式，每次修改重写 tasks.json）
+- journal: JSON 快照 + 追加写入的修改日志，后台压缩
+- sqlite:  按日期 / 任务建索引的 SQLite 数据库
+- array:   每年一个定长数组文件（mmap），任务列表等放在 meta.json
+- sharded: 每年一个 JSON 分片 + 记录任务列表和年份的清单，启动时只读取清单和今年的分片
+
+存储方式由环境变量 DAILY_TASK_STORAGE 选择（默认 journal）。
+"""
+
+import argparse
+import datetime
+import json
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+
+from history_array import ArrayHistory
+from instrumentation import TRACER
+
+DATA_FILE = "tasks.json"
+DB_FILE = "tasks.db"
+ARRAY_DIR = "tasks.days"
+SHARD_DIR = "tasks.d"
+MAX_LOADED_YEARS = 3  # 分片存储最多同时在内存中保留几个年份（今年和待写盘的年份不计）
+COMPACT_THRESHOLD = 500  # 日志累计多少条记录后触发后台压缩
+COALESCE_DELAY = 0.2  # 后台写入线程等待多久，把连续的修改合并成一次写盘
+DEFAULT_BACKEND = os.environ.get("DAILY_TASK_STORAGE", "journal")
+
+
+# 预填充历史数据
+def initialize_data(storage):
+    data = {"tasks": [], "history": {}}
+    today = datetime.date.today()
+    for i in range(1, 369):
+        past_date = today - datetime.timedelta(days=i)
+        data["history"][past_date.isoformat()] = {}
+    storage.save(data)
+    return storage.load() if storage.exists() else data
+
+
+# 按日期顺序列出 [start_date, end_date] 内的 ISO 日期字符串
+def iter_dates(start_date, end_date):
+    for ordinal in range(start_date.toordinal(), end_date.toordinal() + 1):
+        yield datetime.date.fromordinal(ordinal).isoformat()
+
+
+# ========== 📌 每日任务位图 ==========
+# 每个任务在 data["task_index"] 中有固定的位号（只追加、不复用，删除后重新添加沿用原位号），
+# 每天的勾选状态存成该位图的十六进制字符串 day["mask"]，与 completed / total 一起保存
+
+
+# 任务位号表（旧数据没有这张表时按当前任务顺序建立）
+def task_index(data):
+    if "task_index" not in data:
+        data["task_index"] = list(data["tasks"])
+    return data["task_index"]
+
+
+# 任务名 -> 位号
+def task_bits(data):
+    return {task: bit for bit, task in enumerate(task_index(data))}
+
+
+# 若干任务对应的位图
+def tasks_mask(data, tasks):
+    bits = task_bits(data)
+    mask = 0
+    for task in tasks:
+        if task in bits:
+            mask |= 1 << bits[task]
+    return mask
+
+
+# 某天的勾选位图（没有记录为 0）
+def day_mask(day):
+    return int(day.get("mask", "0"), 16) if day else 0
+
+
+def encode_mask(mask):
+    return format(mask, "x")
+
+
+# 把按 source_index 位号记录的当日位图换算成 target_bits（任务名 -> 位号）下的位图
+def translate_day(day, source_index, target_bits):
+    mask = day_mask(day)
+    if not mask:
+        return day
+    translated = 0
+    for bit, task in enumerate(source_index):
+        if mask >> bit & 1 and task in target_bits:
+            translated |= 1 << target_bits[task]
+    day = dict(day)
+    if translated:
+        day["mask"] = encode_mask(translated)
+    else:
+        day.pop("mask", None)
+    return day
+
+
+# 位图中勾选的任务（按任务列表顺序，已删除的任务不计）
+def mask_tasks(data, mask):
+    bits = task_bits(data)
+    return [task for task in data["tasks"] if mask >> bits[task] & 1]
+
+
+# 某天已勾选的任务
+def checked_tasks(data, date):
+    return mask_tasks(data, day_mask(data["history"].get(date)))
+
+
+# 按已勾选的任务生成某天的记录：完成数、总数和位图一起更新
+def checked_day(data, date, checked):
+    day = dict(data["history"].get(date, {}))
+    checked = [task for task in data["tasks"] if task in checked]
+    day["completed"] = len(checked)
+    day["total"] = len(data["tasks"])
+    mask = tasks_mask(data, checked)
+    if mask:
+        day["mask"] = encode_mask(mask)
+    else:
+        day.pop("mask", None)
+    return day
+
+
+# 把一条修改记录应用到内存数据上（重放日志时同样使用，需保证可重复执行）
+def apply_record(data, record):
+    op = record["op"]
+    task = record.get("task")
+    index = task_index(data)  # 必须在修改任务列表之前建立，保证重放得到相同的位号
+    deleted_tasks = data.setdefault("deleted_tasks", [])
+    if op == "add_task":
+        if task in deleted_tasks:  # 同名任务重新添加 → 直接沿用未清理的历史
+            deleted_tasks.remove(task)
+        if task not in data["tasks"]:
+            data["tasks"].append(task)
+        if task not in index:
+            index.append(task)
+    elif op == "delete_task":
+        # 只打墓碑标记，历史中该任务的勾选记录等写快照时再清理
+        if task in data["tasks"]:
+            data["tasks"].remove(task)
+        if task not in deleted_tasks:
+            deleted_tasks.append(task)
+    elif op == "restore_task":
+        # 撤销删除：历史记录还在，放回原位置即可
+        if task in deleted_tasks:
+            deleted_tasks.remove(task)
+        if task not in data["tasks"]:
+            data["tasks"].insert(record.get("position", len(data["tasks"])), task)
+    elif op in ("save_day", "rollover"):
+        day = record["day"]
+        if "checked" in record:  # 日志记录：位图按勾选的任务名换算成本地位号（其他窗口的位号可能不同）
+            mask = tasks_mask(data, record["checked"])
+            if mask != day_mask(day):
+                day = dict(day)
+                if mask:
+                    day["mask"] = encode_mask(mask)
+                else:
+                    day.pop("mask", None)
+        data["history"][record["date"]] = day
+
+
+# 生成写快照用的数据：清理掉已删除（墓碑）任务在历史中的残留（含位图中的对应位），不修改原数据
+# recent 中的墓碑还可以撤销：历史和墓碑本身都原样留在快照里
+def purge_deleted(data, recent=()):
+    deleted_tasks = set(data.get("deleted_tasks", ())) - set(recent)
+    history = dict(data["history"].items())
+    if deleted_tasks:
+        keep = ~tasks_mask(data, deleted_tasks)
+        history = {date: purge_day(day, deleted_tasks, keep) for date, day in history.items()}
+    snapshot = {"tasks": list(data["tasks"]), "history": history, "task_index": list(task_index(data))}
+    kept = [task for task in data.get("deleted_tasks", ()) if task in recent]
+    if kept:
+        snapshot["deleted_tasks"] = kept
+    return snapshot
+
+
+def purge_day(day, deleted_tasks, keep):
+    mask = day_mask(day)
+    if not (deleted_tasks & day.keys() or mask & ~keep):
+        return day
+    day = {task: value for task, value in day.items() if task not in deleted_tasks and task != "mask"}
+    if mask & keep:
+        day["mask"] = encode_mask(mask & keep)
+    return day
+
+
+# 原子写入 JSON 文件：先写临时文件并 fsync，再 rename 覆盖，中途崩溃不会截断原文件
+def write_json_atomic(path, obj, indent=None):
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(obj, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+
+
+# 读取日志文件中的全部记录（崩溃时写了一半的末行会被截掉，避免后续追加接在残行后面）
+# repair=False 时只读：跳过残行但不截断（其他进程可能正在追加这一行）
+def read_journal(path, repair=True):
+    records = []
+    if os.path.exists(path):
+        with open(path, "rb+" if repair else "rb") as f:
+            valid_size = 0
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete record")
+                    records.append(json.loads(line))
+                except ValueError:
+                    if repair:
+                        f.truncate(valid_size)  # 只可能是最后一条没写完
+                    break
+                valid_size += len(line)
+    return records
+
+
+class JsonStorage:
+    """整文件 JSON 存储，每次修改都重写整个文件"""
+
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def read_snapshot(self):
+        data = {"tasks": [], "history": {}}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        return data
+
+    def write_snapshot(self, data):
+        """原子写入整份快照：先写临时文件再 rename，中途崩溃不会截断原文件
+
+        已删除任务的墓碑在这里才真正从历史中清理掉
+        """
+        write_json_atomic(self.path, purge_deleted(data), indent=4)
+
+    def load(self):
+        if not self.exists():
+            return initialize_data(self)
+        return self.read_snapshot()
+
+    def save(self, data):
+        self.write_snapshot(data)
+
+    def save_change(self, data, record):
+        """记录一次修改：应用到内存数据并持久化"""
+        self.write_changes([self.prepare_change(data, record)])
+
+    def prepare_change(self, data, record):
+        """在调用方（界面）线程把修改应用到内存，返回写盘所需的快照
+
+        历史中的每日数据总是整体替换、不会原地修改，浅拷贝即可得到一致的快照
+        """
+        apply_record(data, record)
+        return dict(
+            data,
+            tasks=list(data["tasks"]),
+            history=dict(data["history"]),
+            deleted_tasks=list(data.get("deleted_tasks", [])),
+            task_index=list(task_index(data)),
+        )
+
+    def write_changes(self, changes):
+        """把一批 prepare_change 的结果写盘（可在后台线程执行），整文件存储只需写最后一份快照"""
+        self.write_snapshot(changes[-1])
+
+    def save_changes(self, data, records):
+        """批量修改（导入等）：全部应用到内存后只写一次快照，不为每条修改生成快照"""
+        for record in records:
+            apply_record(data, record)
+        self.write_snapshot(data)
+
+    def history_range(self, data, start_date, end_date):
+        """返回 [start_date, end_date] 内有记录的日期 -> 当日数据"""
+        history = data["history"]
+        return {date: history[date] for date in iter_dates(start_date, end_date) if date in history}
+
+    def available_years(self, data):
+        years = {date.split("-")[0] for date in data["history"]}
+        return sorted(years, reverse=True)  # 最新年份优先
+
+    def watch_paths(self):
+        """需要监视外部修改的文件"""
+        return [self.path]
+
+    def read_state(self):
+        """只读地读取磁盘上的当前数据（检测外部修改用，不触发压缩、不修复文件）"""
+        return self.read_snapshot()
+
+    def close(self):
+        pass
+
+
+class JournalStorage(JsonStorage):
+    """JSON 快照 + 修改日志：每次修改只追加一行，日志过长时在后台合并进快照"""
+
+    def __init__(self, path=DATA_FILE):
+        super().__init__(path)
+        self.journal_path = os.path.splitext(path)[0] + ".journal"  # tasks.json → tasks.journal
+        if self.journal_path == path:
+            self.journal_path = path + ".journal"
+        self.compacting_path = self.journal_path + ".compacting"  # 正在合并进快照的日志段
+        self.journal_records = 0  # 当前日志中的记录数
+        self.stale_tombstones = set()  # 打开前就已存在的墓碑（已过撤销期，压缩时可以清理）
+        self.compaction_lock = threading.Lock()
+
+    def exists(self):
+        return os.path.exists(self.path) or os.path.exists(self.journal_path)
+
+    def load(self):
+        """快照 + 正在压缩的日志段 + 日志尾部；上次会话留下的墓碑在打开时清理（与其他存储方式一致）"""
+        if not self.exists():
+            return initialize_data(self)
+
+        data = self.replay()
+        self.stale_tombstones = set(data.get("deleted_tasks", ()))
+        if self.stale_tombstones:
+            # 已过撤销期：当场压缩一次（日志并入快照，同时清理这些墓碑），再重新读取
+            with self.compaction_lock:
+                if not os.path.exists(self.compacting_path) and os.path.exists(self.journal_path):
+                    os.replace(self.journal_path, self.compacting_path)
+                self.merge_compacting()
+            data = self.replay()
+        elif os.path.exists(self.compacting_path):
+            self.start_compaction()  # 上次压缩中途退出 → 后台接着做完
+        return data
+
+    def replay(self):
+        """读取快照并依次重放待压缩段和日志（截掉崩溃留下的残行）"""
+        data = self.read_snapshot()
+        for record in read_journal(self.compacting_path):
+            apply_record(data, record)
+        tail = read_journal(self.journal_path)
+        for record in tail:
+            apply_record(data, record)
+        self.journal_records = len(tail)
+        return data
+
+    def write_snapshot(self, data):
+        """本次会话删除的任务还能撤销（撤销记录会重放到压缩后的快照上），墓碑和历史都留在快照里，下次打开后再清理"""
+        recent = [task for task in data.get("deleted_tasks", ()) if task not in self.stale_tombstones]
+        write_json_atomic(self.path, purge_deleted(data, recent), indent=4)
+
+    def watch_paths(self):
+        return [self.path, self.journal_path]
+
+    def read_state(self):
+        data = self.read_snapshot()
+        for path in (self.compacting_path, self.journal_path):
+            for record in read_journal(path, repair=False):
+                apply_record(data, record)
+        return data
+
+    def save(self, data):
+        """整份快照已包含全部修改，旧日志一并清掉"""
+        with self.compaction_lock:
+            self.write_snapshot(data)
+            for path in (self.compacting_path, self.journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.journal_records = 0
+
+    def prepare_change(self, data, record):
+        """同一份日志可能由几个窗口追加，各自的位号不同：当日记录同时写下位图对应的任务名，重放时按名换算"""
+        if record["op"] in ("add_task", "restore_task"):
+            self.stale_tombstones.discard(record["task"])  # 重新添加后再删除的任务同样可以撤销
+        if record["op"] in ("save_day", "rollover"):
+            mask = day_mask(record["day"])
+            index = task_index(data)
+            record = dict(record, checked=[task for bit, task in enumerate(index) if mask >> bit & 1])
+        apply_record(data, record)
+        return record
+
+    def write_changes(self, records):
+        """一批修改一次追加、一次 fsync"""
+        with open(self.journal_path, "a") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_records += len(records)
+
+        if self.journal_records >= COMPACT_THRESHOLD:
+            self.start_compaction()
+
+    def save_changes(self, data, records):
+        self.write_changes([self.prepare_change(data, record) for record in records])
+
+    def start_compaction(self):
+        """把当前日志转为待压缩段，由后台线程合并进快照"""
+        if not self.compaction_lock.acquire(blocking=False):
+            return  # 已有压缩在进行
+        try:
+            if not os.path.exists(self.compacting_path):
+                if not os.path.exists(self.journal_path):
+                    self.compaction_lock.release()
+                    return
+                os.replace(self.journal_path, self.compacting_path)  # 之后的修改写入新日志
+                self.journal_records = 0
+        except OSError:
+            self.compaction_lock.release()
+            raise
+        threading.Thread(target=self.compact_journal, daemon=True).start()
+
+    def compact_journal(self):
+        """在后台线程中执行压缩"""
+        try:
+            self.merge_compacting()
+        finally:
+            self.compaction_lock.release()
+
+    def merge_compacting(self):
+        """快照 + 待压缩段 → 新快照（原子 rename），完成后删除该段；调用方持有压缩锁"""
+        data = self.read_snapshot()
+        for record in read_journal(self.compacting_path):
+            apply_record(data, record)
+        self.write_snapshot(data)
+        if os.path.exists(self.compacting_path):
+            os.remove(self.compacting_path)
+
+
+class SqliteHistory(Mapping):
+    """SQLite 中历史数据的只读字典视图（日期 -> 当日数据），按需查询"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.pending = {}  # 已在界面中保存、还没写入数据库的日期 -> 当日数据
+        self.pending_lock = threading.Lock()
+
+    def __setitem__(self, date, day):
+        with self.pending_lock:
+            self.pending[date] = day
+
+    def written(self, date, day):
+        """后台写入完成后，去掉已落盘的待写数据（期间又被修改的保留）"""
+        with self.pending_lock:
+            if self.pending.get(date) is day:
+                del self.pending[date]
+
+    def query(self, where="", params=()):
+        days = {}
+        for date, completed, total, mask in self.conn.execute(
+            f"SELECT date, completed, total, mask FROM days {where} ORDER BY date", params
+        ):
+            day = days[date] = {}
+            if completed is not None:
+                day["completed"] = completed
+            if total is not None:
+                day["total"] = total
+            if mask is not None:
+                day["mask"] = mask
+        for date, task, value in self.conn.execute(
+            f"SELECT date, task, value FROM day_tasks {where}", params
+        ):
+            if date in days:
+                days[date][task] = value
+        return days
+
+    def range(self, start, end):
+        days = self.query("WHERE date BETWEEN ? AND ?", (start, end))
+        days.update((date, day) for date, day in list(self.pending.items()) if start <= date <= end)
+        return days
+
+    def years(self):
+        """逐年跳跃查询最小日期，只走主键索引，不扫描全部行"""
+        years = []
+        row = self.conn.execute("SELECT MIN(date) FROM days").fetchone()
+        while row[0] is not None:
+            year = row[0].split("-")[0]
+            years.append(year)
+            row = self.conn.execute(
+                "SELECT MIN(date) FROM days WHERE date >= ?", (f"{int(year) + 1:04d}",)
+            ).fetchone()
+        years.extend({date.split("-")[0] for date in list(self.pending)} - set(years))
+        return years
+
+    def __getitem__(self, date):
+        day = self.pending.get(date)
+        if day is not None:
+            return day
+        days = self.query("WHERE date = ?", (date,))
+        if date not in days:
+            raise KeyError(date)
+        return days[date]
+
+    def __contains__(self, date):
+        if date in self.pending:
+            return True
+        return self.conn.execute("SELECT 1 FROM days WHERE date = ?", (date,)).fetchone() is not None
+
+    def __iter__(self):
+        dates = {date for (date,) in self.conn.execute("SELECT date FROM days")}
+        return iter(sorted(dates | set(self.pending)))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def items(self):
+        days = self.query()
+        days.update(list(self.pending.items()))
+        return days.items()
+
+
+class SqliteStorage:
+    """SQLite 存储：任务表 + 按日期索引的每日结果表 + 按 (日期, 任务) 索引的勾选表"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            name TEXT PRIMARY KEY,
+            position INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS days (
+            date TEXT PRIMARY KEY,
+            completed INTEGER,
+            total INTEGER,
+            mask TEXT
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS day_tasks (
+            date TEXT NOT NULL,
+            task TEXT NOT NULL,
+            value INTEGER NOT NULL,
+            PRIMARY KEY (date, task)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS day_tasks_by_task ON day_tasks (task);
+        CREATE TABLE IF NOT EXISTS deleted_tasks (
+            name TEXT PRIMARY KEY
+        );
+        CREATE TABLE IF NOT EXISTS task_bits (
+            name TEXT PRIMARY KEY,
+            bit INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.conn = None
+        self.writer_conn = None  # 后台写入线程专用的连接
+        self.reader_conn = None  # read_state 用的只读连接
+        self.history = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def connect(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path)
+            self.conn.executescript(self.SCHEMA)
+            columns = {name for _, name, *_ in self.conn.execute("PRAGMA table_info(days)")}
+            if "mask" not in columns:  # 旧数据库补上位图列
+                self.conn.execute("ALTER TABLE days ADD COLUMN mask TEXT")
+        return self.conn
+
+    def load(self):
+        if not self.exists():
+            return initialize_data(self)
+        conn = self.connect()
+        tasks = [name for (name,) in conn.execute("SELECT name FROM tasks ORDER BY position")]
+        index = [name for (name,) in conn.execute("SELECT name FROM task_bits ORDER BY bit")]
+        with conn:  # 打开时顺便清理上次会话留下的墓碑（走 task 索引）
+            deleted = [name for (name,) in conn.execute("SELECT name FROM deleted_tasks")]
+            if deleted:
+                self.purge_masks(conn, tasks_mask({"tasks": tasks, "task_index": index}, deleted))
+            conn.execute("DELETE FROM day_tasks WHERE task IN (SELECT name FROM deleted_tasks)")
+            conn.execute("DELETE FROM deleted_tasks")
+            if not index:  # 旧数据库：按当前任务顺序建立位号表
+                index = list(tasks)
+                self.write_task_bits(conn, index)
+        self.history = SqliteHistory(conn)
+        return {"tasks": tasks, "history": self.history, "deleted_tasks": [], "task_index": index}
+
+    def purge_masks(self, conn, cleared):
+        """清掉已删除任务在每天位图中的对应位（位图是十六进制文本，在 Python 中计算）
+
+        清空后的位图写 NULL，与 write_day 中没有勾选的天一致
+        """
+        updates = [
+            (encode_mask(int(mask, 16) & ~cleared) if int(mask, 16) & ~cleared else None, date)
+            for date, mask in conn.execute("SELECT date, mask FROM days WHERE mask IS NOT NULL")
+            if int(mask, 16) & cleared
+        ]
+        conn.executemany("UPDATE days SET mask = ? WHERE date = ?", updates)
+
+    def write_task_bits(self, conn, index):
+        conn.execute("DELETE FROM task_bits")
+        conn.executemany(
+            "INSERT INTO task_bits (name, bit) VALUES (?, ?)", [(task, bit) for bit, task in enumerate(index)]
+        )
+
+    def write_task_order(self, conn, tasks):
+        conn.execute("DELETE FROM tasks")
+        conn.executemany(
+            "INSERT INTO tasks (name, position) VALUES (?, ?)",
+            [(task, position) for position, task in enumerate(tasks)],
+        )
+
+    def write_day(self, conn, date, day):
+        conn.execute(
+            "INSERT OR REPLACE INTO days (date, completed, total, mask) VALUES (?, ?, ?, ?)",
+            (date, day.get("completed"), day.get("total"), day.get("mask")),
+        )
+        conn.execute("DELETE FROM day_tasks WHERE date = ?", (date,))
+        conn.executemany(
+            "INSERT INTO day_tasks (date, task, value) VALUES (?, ?, ?)",
+            [(date, task, value) for task, value in day.items() if task not in ("completed", "total", "mask")],
+        )
+
+    def save(self, data):
+        """整体替换数据库内容（初始化 / 迁移时使用）"""
+        conn = self.connect()
+        snapshot = purge_deleted(data)
+        with conn:
+            conn.execute("DELETE FROM days")
+            conn.execute("DELETE FROM day_tasks")
+            conn.execute("DELETE FROM deleted_tasks")
+            self.write_task_order(conn, snapshot["tasks"])
+            self.write_task_bits(conn, snapshot["task_index"])
+            for date, day in snapshot["history"].items():
+                self.write_day(conn, date, day)
+
+    def save_change(self, data, record):
+        self.write_changes([self.prepare_change(data, record)])
+
+    def save_changes(self, data, records):
+        self.write_changes([self.prepare_change(data, record) for record in records])
+
+    def prepare_change(self, data, record):
+        """任务列表直接改内存；当日数据先放进历史视图的待写区，写入数据库后再移除"""
+        apply_record(data, record)
+        bit = task_index(data).index(record["task"]) if record["op"] == "add_task" else None
+        return record, list(data["tasks"]), bit
+
+    def write_changes(self, changes):
+        """一批修改在一个事务里执行，每种修改对应几条带索引的 SQL，不需要整体重写"""
+        if self.writer_conn is None:
+            self.writer_conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn = self.writer_conn
+        with conn:
+            for record, tasks, bit in changes:
+                op = record["op"]
+                if op == "add_task":
+                    conn.execute("DELETE FROM deleted_tasks WHERE name = ?", (record["task"],))
+                    conn.execute(
+                        "INSERT OR IGNORE INTO tasks (name, position) "
+                        "VALUES (?, (SELECT COALESCE(MAX(position) + 1, 0) FROM tasks))",
+                        (record["task"],),
+                    )
+                    conn.execute("INSERT OR IGNORE INTO task_bits (name, bit) VALUES (?, ?)", (record["task"], bit))
+                elif op == "delete_task":
+                    # 墓碑：勾选记录留到下次打开时再按 task 索引清理，便于撤销
+                    conn.execute("DELETE FROM tasks WHERE name = ?", (record["task"],))
+                    conn.execute("INSERT OR IGNORE INTO deleted_tasks (name) VALUES (?)", (record["task"],))
+                elif op == "restore_task":
+                    conn.execute("DELETE FROM deleted_tasks WHERE name = ?", (record["task"],))
+                    self.write_task_order(conn, tasks)  # 放回原位置，重排序号
+                elif op in ("save_day", "rollover"):
+                    self.write_day(conn, record["date"], record["day"])
+        if self.history is not None:
+            for record, _, _ in changes:
+                if record["op"] in ("save_day", "rollover"):
+                    self.history.written(record["date"], record["day"])
+
+    def history_range(self, data, start_date, end_date):
+        return data["history"].range(start_date.isoformat(), end_date.isoformat())
+
+    def available_years(self, data):
+        return sorted(data["history"].years(), reverse=True)  # 最新年份优先
+
+    def watch_paths(self):
+        return []  # 多个实例按行写入同一个数据库，不会整体覆盖，无需监视
+
+    def read_state(self):
+        """只读连接读取当前数据：不建表、不清理墓碑（批量报告等不应修改数据的场合）"""
+        if self.reader_conn is None:
+            uri = pathlib.Path(self.path).absolute().as_uri() + "?mode=ro"
+            self.reader_conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn = self.reader_conn
+        tasks = [name for (name,) in conn.execute("SELECT name FROM tasks ORDER BY position")]
+        index = [name for (name,) in conn.execute("SELECT name FROM task_bits ORDER BY bit")]
+        deleted = [name for (name,) in conn.execute("SELECT name FROM deleted_tasks")]
+        return {"tasks": tasks, "history": SqliteHistory(conn), "deleted_tasks": deleted, "task_index": index or list(tasks)}
+
+    def close(self):
+        for conn in (self.conn, self.writer_conn, self.reader_conn):
+            if conn is not None:
+                conn.close()
+        self.conn = self.writer_conn = self.reader_conn = None
+
+
+class ArrayStorage:
+    """数组存储：历史（含勾选位图）按年存成定长记录文件（见 history_array），任务列表等很少变化的数据存在 meta.json"""
+
+    def __init__(self, path=ARRAY_DIR):
+        self.path = path
+        self.meta_path = os.path.join(path, "meta.json")
+        self.history = None
+        self.reader = None  # read_state 打开的只读历史
+
+    def exists(self):
+        return os.path.exists(self.meta_path)
+
+    def open_history(self, extras):
+        if self.history is not None:
+            self.history.close()
+        self.history = ArrayHistory(self.path, extras)
+        return self.history
+
+    def write_meta(self, data):
+        """任务列表、墓碑和附加字段都很小，原子重写即可"""
+        meta = {
+            "tasks": data["tasks"],
+            "deleted_tasks": data.get("deleted_tasks", []),
+            "task_index": data.get("task_index", data["tasks"]),
+            "extras": data.get("extras", self.history.extras),
+        }
+        write_json_atomic(self.meta_path, meta)
+
+    def load(self):
+        if not self.exists():
+            return initialize_data(self)
+        with open(self.meta_path, "r") as f:
+            meta = json.load(f)
+        history = self.open_history(meta.get("extras", {}))
+        data = {
+            "tasks": meta["tasks"],
+            "history": history,
+            "deleted_tasks": meta.get("deleted_tasks", []),
+            "task_index": meta.get("task_index", list(meta["tasks"])),
+        }
+        legacy = [date for date, fields in history.extras.items() if "mask" in fields]
+        for date in legacy:  # 旧版本把位图存在 extras 中：迁移到每年的位图文件（只发生一次）
+            history[date] = dict(history[date], mask=history.extras[date]["mask"])
+        if data["deleted_tasks"]:  # 打开时清理上次会话留下的墓碑：位图中的对应位 + extras
+            history.clear_mask_bits(tasks_mask(data, data["deleted_tasks"]))
+            snapshot = purge_deleted(dict(data, history=history.extras))
+            history.extras.clear()
+            history.extras.update((date, day) for date, day in snapshot["history"].items() if day)
+            data["deleted_tasks"] = []
+        if legacy or data["deleted_tasks"] != meta.get("deleted_tasks", []):
+            history.flush()
+            self.write_meta(data)
+        return data
+
+    def save(self, data):
+        """整体替换全部年份文件（初始化 / 迁移时使用）"""
+        snapshot = purge_deleted(data)
+        os.makedirs(self.path, exist_ok=True)
+        if self.history is not None:
+            self.history.close()
+        for name in os.listdir(self.path):
+            if name.endswith((".days", ".masks")):
+                os.remove(os.path.join(self.path, name))
+        history = self.open_history({})
+        for date, day in snapshot["history"].items():
+            history[date] = day
+        history.flush()
+        self.write_meta(snapshot)
+
+    def save_change(self, data, record):
+        self.write_changes([self.prepare_change(data, record)])
+
+    def prepare_change(self, data, record):
+        """当天数据（含位图）直接写进 mmap 中的定长记录；需要重写 meta.json 时返回它的快照"""
+        extras = data["history"].extras
+        before = extras.get(record.get("date"))
+        apply_record(data, record)
+        if record["op"] in ("save_day", "rollover") and extras.get(record["date"]) == before:
+            return None  # 附加字段没有变化，无需重写 meta.json
+        return self.meta_snapshot(data)
+
+    def meta_snapshot(self, data):
+        return {
+            "tasks": list(data["tasks"]),
+            "deleted_tasks": list(data.get("deleted_tasks", [])),
+            "task_index": list(task_index(data)),
+            "extras": dict(data["history"].extras),
+        }
+
+    def save_changes(self, data, records):
+        """批量修改：每天直接写进 mmap，meta.json 最后只写一次"""
+        for record in records:
+            apply_record(data, record)
+        self.write_changes([self.meta_snapshot(data)])
+
+    def write_changes(self, metas):
+        self.history.flush()
+        metas = [meta for meta in metas if meta is not None]
+        if metas:
+            self.write_meta(metas[-1])
+
+    def history_range(self, data, start_date, end_date):
+        return data["history"].range(start_date, end_date)
+
+    def available_years(self, data):
+        return sorted((f"{year:04d}" for year in data["history"].available_years()), reverse=True)
+
+    def watch_paths(self):
+        return []  # 暂不支持检测外部修改
+
+    def read_state(self):
+        """只读打开（mmap 只读）：不迁移旧格式、不清理墓碑"""
+        with open(self.meta_path, "r") as f:
+            meta = json.load(f)
+        if self.reader is not None:
+            self.reader.close()
+        self.reader = ArrayHistory(self.path, meta.get("extras", {}), readonly=True)
+        return {
+            "tasks": meta["tasks"],
+            "history": self.reader,
+            "deleted_tasks": meta.get("deleted_tasks", []),
+            "task_index": meta.get("task_index", list(meta["tasks"])),
+        }
+
+    def close(self):
+        for history in (self.history, self.reader):
+            if history is not None:
+                history.close()
+        self.history = self.reader = None
+
+
+class ShardedHistory(MutableMapping):
+    """按年份分片的历史数据：某年的分片第一次被访问时才读取，超出上限时淘汰最久未用的年份"""
+
+    def __init__(self, directory, years, max_loaded=MAX_LOADED_YEARS):
+        self.directory = directory
+        self.years = set(years)  # 有分片的年份（来自清单，不需要读取分片）
+        self.max_loaded = max_loaded
+        self.shards = OrderedDict()  # 年份 -> {日期: 当日数据}，按最近使用排序
+        self.pinned = {str(datetime.date.today().year)}  # 不淘汰：今年
+        self.pending = {}  # 年份 -> 已修改、还没写盘的次数（写盘前不能淘汰，否则会读回旧数据）
+        self.pending_lock = threading.Lock()
+
+    def shard_path(self, year):
+        return os.path.join(self.directory, f"{year}.json")
+
+    def shard(self, year, create=False):
+        """某年的分片（按需读取）；没有该年分片且 create 为 False 时返回 None"""
+        if year in self.shards:
+            self.shards.move_to_end(year)
+            return self.shards[year]
+        if year not in self.years and not create:
+            return None
+        days = {}
+        if year in self.years and os.path.exists(self.shard_path(year)):
+            with open(self.shard_path(year), "r") as f:
+                days = json.load(f)
+        self.years.add(year)
+        self.shards[year] = days
+        self.evict()
+        return days
+
+    def evict(self, max_loaded=None):
+        """淘汰最久未用的分片，只保留 max_loaded 个（今年和待写盘的年份除外）"""
+        limit = self.max_loaded if max_loaded is None else max_loaded
+        with self.pending_lock:
+            evictable = [year for year in self.shards if year not in self.pinned and not self.pending.get(year)]
+        for year in evictable[: max(0, len(evictable) - limit)]:
+            del self.shards[year]
+
+    def mark_pending(self, year):
+        with self.pending_lock:
+            self.pending[year] = self.pending.get(year, 0) + 1
+
+    def written(self, year):
+        with self.pending_lock:
+            self.pending[year] -= 1
+            if not self.pending[year]:
+                del self.pending[year]
+
+    def __getitem__(self, date):
+        days = self.shard(date[:4])
+        if days is None:
+            raise KeyError(date)
+        return days[date]
+
+    def __contains__(self, date):
+        days = self.shard(date[:4])
+        return days is not None and date in days
+
+    def __setitem__(self, date, day):
+        self.shard(date[:4], create=True)[date] = day
+
+    def __delitem__(self, date):
+        days = self.shard(date[:4])
+        if days is None:
+            raise KeyError(date)
+        del days[date]
+
+    def __iter__(self):
+        for year in sorted(self.years):
+            yield from sorted(self.shard(year))
+
+    def __len__(self):
+        return sum(len(self.shard(year)) for year in sorted(self.years))
+
+    def range(self, start_date, end_date):
+        """只读取范围涉及的年份"""
+        days = {}
+        for year in range(start_date.year, end_date.year + 1):
+            shard = self.shard(f"{year:04d}")
+            if not shard:
+                continue
+            first = max(start_date, datetime.date(year, 1, 1))
+            last = min(end_date, datetime.date(year, 12, 31))
+            days.update((date, shard[date]) for date in iter_dates(first, last) if date in shard)
+        return days
+
+
+class ShardedStorage:
+    """年份分片存储：<目录>/manifest.json 记录任务列表、位号表和有数据的年份，<目录>/<年份>.json 为当年历史
+
+    启动时只读取清单和今年的分片，其他年份在切换到该年时才读取；
+    保存一天的进度只重写这一年的分片，任务增删只重写清单。
+    """
+
+    def __init__(self, path=SHARD_DIR):
+        self.path = path
+        self.manifest_path = os.path.join(path, "manifest.json")
+        self.history = None
+
+    def exists(self):
+        return os.path.exists(self.manifest_path)
+
+    def manifest(self, data):
+        return {
+            "tasks": list(data["tasks"]),
+            "task_index": list(task_index(data)),
+            "deleted_tasks": list(data.get("deleted_tasks", [])),
+            "years": sorted(self.history.years),
+        }
+
+    def load(self):
+        if not self.exists():
+            return initialize_data(self)
+        with open(self.manifest_path, "r") as f:
+            manifest = json.load(f)
+        self.history = ShardedHistory(self.path, manifest["years"])
+        data = {
+            "tasks": manifest["tasks"],
+            "history": self.history,
+            "deleted_tasks": manifest.get("deleted_tasks", []),
+            "task_index": manifest.get("task_index", list(manifest["tasks"])),
+        }
+        if data["deleted_tasks"]:  # 上次会话删除的任务：打开时清理各分片中的残留（只在删过任务后发生一次）
+            self.save(data)
+            data["history"], data["deleted_tasks"] = self.history, []
+        self.history.shard(str(datetime.date.today().year))  # 今年的分片（今年还没有记录时不读取）
+        return data
+
+    def save(self, data):
+        """整体重写全部分片和清单（初始化 / 迁移 / 清理墓碑时使用）"""
+        snapshot = purge_deleted(data)
+        shards = {}
+        for date, day in snapshot["history"].items():
+            shards.setdefault(date[:4], {})[date] = day
+        os.makedirs(self.path, exist_ok=True)
+        for name in os.listdir(self.path):
+            if name != "manifest.json" and name.endswith(".json") and name[:-5] not in shards:
+                os.remove(os.path.join(self.path, name))
+        self.history = ShardedHistory(self.path, shards)
+        for year, days in shards.items():
+            write_json_atomic(self.history.shard_path(year), days)
+        write_json_atomic(self.manifest_path, self.manifest(snapshot))
+
+    def save_change(self, data, record):
+        self.write_changes([self.prepare_change(data, record)])
+
+    def prepare_change(self, data, record):
+        """当天数据只涉及一年：返回该年分片的浅拷贝；任务增删或新增年份时附带清单"""
+        years = len(self.history.years)
+        apply_record(data, record)
+        change = {"shard": None, "manifest": None}
+        if record["op"] in ("save_day", "rollover"):
+            year = record["date"][:4]
+            self.history.mark_pending(year)
+            change["shard"] = (year, dict(self.history.shard(year)))
+        if record["op"] not in ("save_day", "rollover") or len(self.history.years) != years:
+            change["manifest"] = self.manifest(data)
+        return change
+
+    def save_changes(self, data, records):
+        """批量修改：涉及的每个年份只复制、写入一次分片"""
+        years = len(self.history.years)
+        touched = set()
+        manifest = False
+        for record in records:
+            if record["op"] in ("save_day", "rollover") and record["date"][:4] not in touched:
+                touched.add(record["date"][:4])
+                self.history.mark_pending(record["date"][:4])  # 写盘前不能被淘汰
+            manifest |= record["op"] not in ("save_day", "rollover")
+            apply_record(data, record)
+        changes = [{"shard": (year, dict(self.history.shard(year))), "manifest": None} for year in sorted(touched)]
+        if manifest or len(self.history.years) != years:
+            changes.append({"shard": None, "manifest": self.manifest(data)})
+        if changes:
+            self.write_changes(changes)
+
+    def write_changes(self, changes):
+        shards = {}
+        manifests = [change["manifest"] for change in changes if change["manifest"] is not None]
+        for change in changes:
+            if change["shard"] is not None:
+                year, days = change["shard"]
+                shards[year] = days  # 同一年只写最后一份
+        try:
+            for year, days in shards.items():
+                write_json_atomic(self.history.shard_path(year), days)
+            if manifests:
+                write_json_atomic(self.manifest_path, manifests[-1])
+        finally:
+            for change in changes:
+                if change["shard"] is not None:
+                    self.history.written(change["shard"][0])
+
+    def history_range(self, data, start_date, end_date):
+        return data["history"].range(start_date, end_date)
+
+    def available_years(self, data):
+        return sorted(data["history"].years, reverse=True)  # 来自清单，不需要读取分片
+
+    def watch_paths(self):
+        return []  # 暂不支持检测外部修改
+
+    def read_state(self):
+        """只读取清单，分片按需读取：不清理墓碑、不写任何文件"""
+        with open(self.manifest_path, "r") as f:
+            manifest = json.load(f)
+        return {
+            "tasks": manifest["tasks"],
+            "history": ShardedHistory(self.path, manifest["years"]),
+            "deleted_tasks": manifest.get("deleted_tasks", []),
+            "task_index": manifest.get("task_index", list(manifest["tasks"])),
+        }
+
+    def close(self):
+        pass
+
+
+class BackgroundWriter:
+    """后台写入线程：界面线程只在内存中应用修改并提交，写盘（含 fsync）全部在后台完成
+
+    短时间内连续提交的修改合并成一次写入；写入失败通过 on_error 回调通知
+    （在写入线程中调用，不能直接操作 Tk：界面中放进事件队列由主线程显示）；关闭窗口前调用 close() 写完剩余修改。
+    """
+
+    STOP = object()
+
+    def __init__(self, storage, on_error=None, delay=COALESCE_DELAY, on_written=None):
+        self.storage = storage
+        self.on_error = on_error
+        self.on_written = on_written  # 每批写盘成功后在后台线程中调用
+        self.delay = delay
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def save_change(self, data, record):
+        """界面线程调用：立即更新内存数据，不等待磁盘"""
+        with TRACER.span("save_change", op=record["op"]):
+            self.queue.put(self.storage.prepare_change(data, record))
+
+    def run(self):
+        while True:
+            change = self.queue.get()
+            if change is self.STOP:
+                self.queue.task_done()
+                return
+            if self.delay:
+                time.sleep(self.delay)  # 等一小会儿，把连续的修改攒成一批
+            changes = [change]
+            stop = False
+            while True:
+                try:
+                    change = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if change is self.STOP:
+                    stop = True
+                    break
+                changes.append(change)
+            try:
+                with TRACER.span("save_data", records=len(changes)):
+                    self.storage.write_changes(changes)
+                if self.on_written is not None:
+                    self.on_written()
+            except Exception as e:  # 写盘失败不能让线程退出，交给界面提示
+                if self.on_error is not None:
+                    self.on_error(e)
+            for _ in range(len(changes) + stop):
+                self.queue.task_done()
+            if stop:
+                return
+
+    def idle(self):
+        """已提交的修改是否都已写盘"""
+        return self.queue.unfinished_tasks == 0
+
+    def flush(self):
+        """等待已提交的修改全部写盘"""
+        self.queue.join()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(self.STOP)
+            self.thread.join()
+
+
+BACKENDS = {
+    "json": JsonStorage,
+    "journal": JournalStorage,
+    "sqlite": SqliteStorage,
+    "array": ArrayStorage,
+    "sharded": ShardedStorage,
+}
+
+default_storage = None
+
+
+# 按名称创建存储引擎
+def open_storage(backend=None, path=None):
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"未知的存储方式: {backend}（可选: {', '.join(BACKENDS)}）")
+    return BACKENDS[backend](path) if path else BACKENDS[backend]()
+
+
+# 当前进程默认使用的存储引擎
+def get_storage():
+    global default_storage
+    if default_storage is None:
+        default_storage = open_storage()
+    return default_storage
+
+
+# 一次性迁移：把 source 的全部数据写入 target（会覆盖 target 原有内容）
+def migrate(source, target):
+    data = source.load()
+    target.save(data)
+    return len(data["tasks"]), len(data["history"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="在不同存储方式之间迁移任务数据")
+    parser.add_argument("source", choices=BACKENDS, help="源存储方式")
+    parser.add_argument("target", choices=BACKENDS, help="目标存储方式")
+    parser.add_argument("--source-path", help="源文件路径（默认使用该存储方式的默认文件）")
+    parser.add_argument("--target-path", help="目标文件路径")
+    args = parser.parse_args()
+
+    source = open_storage(args.source, args.source_path)
+    target = open_storage(args.target, args.target_path)
+    if not source.exists():
+        parser.error(f"源数据不存在: {source.path}")
+    tasks, days = migrate(source, target)
+    source.close()
+    target.close()
+    print(f"✅ 已迁移 {tasks} 个任务、{days} 天历史: {args.source} → {args.target}")
+
+
+if __name__ == "__main__":
+    main()